@@ -1,12 +1,18 @@
 from .sidebar import SidebarComponent
 from .database_module import get_bigquery_module,get_supabase_api #,get_supabase_module,get_combined_module
+from .clients import client_registry
+from .date_index import DateIndexedFrame
 from .other_components import DownloadComponent
-from .reviews import SeasonBase,SeasonalReviewComponent,AnnualReviewComponent
+from .reviews import SeasonBase,SeasonalReviewComponent,AnnualReviewComponent,load_review_dataset,clear_review_dataset
 
 __all__ = ["SidebarComponent",
            "get_bigquery_module",
             "SeasonBase",
             "SeasonalReviewComponent",
             "AnnualReviewComponent",
+            "load_review_dataset",
+            "clear_review_dataset",
            "get_supabase_api", 
+           "client_registry",
+           "DateIndexedFrame",
            "DownloadComponent"]
\ No newline at end of file
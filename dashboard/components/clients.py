@@ -0,0 +1,68 @@
+import atexit
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    '''
+    Process-wide store of database clients, shared across reruns and sessions.
+
+    Clients are keyed by name and a fingerprint of the credentials they were built with.
+    If the credentials change (e.g. rotated secrets), the old client is closed and a new one is built.
+
+    Usage:
+        client = client_registry.get("bigquery", st.secrets["gcp_service_account"], lambda: bigquery.Client(...))
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple[str, Any]] = {}
+
+    @staticmethod
+    def fingerprint(credentials: Any) -> str:
+        if isinstance(credentials, Mapping):
+            credentials = sorted((k, repr(v)) for k, v in credentials.items())
+        return hashlib.sha256(repr(credentials).encode("utf-8")).hexdigest()
+
+    def get(self, name: str, credentials: Any, factory: Callable[[], Any]) -> Any:
+        fingerprint = self.fingerprint(credentials)
+        with self._lock:
+            entry = self._clients.get(name)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]
+            if entry is not None:
+                logger.info(f"Credentials for client '{name}' changed. Rebuilding client.")
+                self._close(name, entry[1])
+            client = factory()
+            self._clients[name] = (fingerprint, client)
+            logger.info(f"Created client '{name}'.")
+            return client
+
+    def invalidate(self, name: Optional[str] = None):
+        '''Close and forget one client, or all clients if name is None. The next get() builds a new one.'''
+        with self._lock:
+            names = [name] if name else list(self._clients)
+            for n in names:
+                entry = self._clients.pop(n, None)
+                if entry is not None:
+                    self._close(n, entry[1])
+
+    def close_all(self):
+        self.invalidate()
+
+    @staticmethod
+    def _close(name: str, client: Any):
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"Error closing client '{name}': {e}")
+
+
+client_registry = ClientRegistry()
+atexit.register(client_registry.close_all)
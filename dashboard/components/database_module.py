@@ -6,16 +6,128 @@ import calendar
 import pandas as pd
 from supabase import create_client
 from datetime import date, datetime,timedelta
-from typing import Optional,Any, List, Dict,Tuple,Literal, Union
+from typing import Optional,Any, List, Dict,Tuple,Literal, Union, Callable
 import logging
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from .models import JobLog, User, WorkRequest, HistoricalJobEntry
+from .models import JobLog, User, WorkRequest, HistoricalJobEntry, ValidationMode, validate_records
+from .clients import client_registry
+from .replica import RegistrationsReplica
+from .date_index import DateIndexedFrame
+from .schema import compact_frame
 import numpy as np
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+JOB_LOGS_ROW_LIMIT = 1000  # max rows returned per call by get_job_logs_with_api_key
+
+ROLE_CATEGORIES = ["u13", "genf", "hjelpementor", "mentor", "unknown"]
+
+DEFAULT_HOUR_LIMITS = {"genf": (2.5, 4.5)}  # role -> (max hours on weekdays, max hours on weekends)
+
+HOURS_TABLE_ID = "genf-446213.raw.hours"
+HOURS_STAGING_TABLE_ID = "genf-446213.raw.hours_staging"
+SYNC_WATERMARKS_TABLE_ID = "genf-446213.raw.sync_watermarks"
+
+HOURS_STAGING_SCHEMA = [
+    bigquery.SchemaField("id", "STRING"),
+    bigquery.SchemaField("worker_id", "STRING"),
+    bigquery.SchemaField("work_type", "STRING"),
+    bigquery.SchemaField("date_completed", "TIMESTAMP"),
+    bigquery.SchemaField("hours_worked", "FLOAT"),
+    bigquery.SchemaField("units_completed", "INTEGER"),
+    bigquery.SchemaField("comments", "STRING"),
+    bigquery.SchemaField("role", "STRING"),
+    bigquery.SchemaField("date_of_birth", "TIMESTAMP"),
+    bigquery.SchemaField("work_leader", "STRING"),
+    bigquery.SchemaField("work_type_id", "STRING"),
+    bigquery.SchemaField("worker_name", "STRING"),
+    bigquery.SchemaField("season", "STRING"),
+]
+
+SCHEMA_CACHE_TTL = 1800  # seconds a cached BigQuery table schema is trusted
+TABLE_VERSION_TTL = 60   # seconds a table's last modified time is trusted
+
+# full_table_id -> (fetched at, {column: bigquery type}), shared by all BigQueryModule instances
+_schema_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_schema_cache_lock = threading.Lock()
+
+_TRUE_STRINGS = ["true", "1", "yes"]
+
+WRITE_CHUNK_ROWS = 200_000      # rows per Parquet file / load job in write_df
+PARQUET_COMPRESSION = "zstd"
+
+# BigQuery column type -> Arrow type used when serializing write_df frames to Parquet
+_ARROW_TYPES = {
+    "STRING": pa.string(),
+    "INT64": pa.int64(),
+    "INTEGER": pa.int64(),
+    "FLOAT64": pa.float64(),
+    "FLOAT": pa.float64(),
+    "BOOL": pa.bool_(),
+    "BOOLEAN": pa.bool_(),
+    "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+    "DATETIME": pa.timestamp("us"),
+    "DATE": pa.date32(),
+}
+
+_SYNC_WATERMARKS_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{SYNC_WATERMARKS_TABLE_ID}` (
+        name STRING, created_at TIMESTAMP, id STRING, synced_at TIMESTAMP
+    );"""
+
+# raw.job_logs (j) JOIN raw.users (u) -> raw.hours rows. Same mapping as the pandas path in transfer_to_hours.
+# date_completed is epoch seconds as FLOAT64; it is truncated to microseconds like the pandas path, not rounded to seconds.
+_HOURS_FROM_JOB_LOGS_SQL = """
+    SELECT
+        j.id,
+        j.worker_id,
+        j.work_type,
+        TIMESTAMP_MICROS(CAST(TRUNC(j.date_completed * 1e6) AS INT64)) AS date_completed,
+        j.hours_worked,
+        CAST(j.units_completed AS INT64) AS units_completed,
+        j.comments,
+        CASE u.age_category
+            WHEN 'O18' THEN 'mentor'
+            WHEN 'U18' THEN 'hjelpementor'
+            WHEN 'U16' THEN 'genf'
+            ELSE 'unknown'
+        END AS role,
+        SAFE_CAST(u.date_of_birth AS TIMESTAMP) AS date_of_birth,
+        j.work_leader,
+        j.work_type_id,
+        CONCAT(j.worker_first_name, ' ', j.worker_last_name) AS worker_name,
+        -- Season starts in August: "25/26" for 2025-08-01 .. 2026-07-31 (UTC)
+        FORMAT('%02d/%02d',
+            MOD(EXTRACT(YEAR FROM TIMESTAMP_MICROS(CAST(TRUNC(j.date_completed * 1e6) AS INT64)))
+                - IF(EXTRACT(MONTH FROM TIMESTAMP_MICROS(CAST(TRUNC(j.date_completed * 1e6) AS INT64))) < 8, 1, 0), 100),
+            MOD(EXTRACT(YEAR FROM TIMESTAMP_MICROS(CAST(TRUNC(j.date_completed * 1e6) AS INT64)))
+                - IF(EXTRACT(MONTH FROM TIMESTAMP_MICROS(CAST(TRUNC(j.date_completed * 1e6) AS INT64))) < 8, 1, 0) + 1, 100)
+        ) AS season,
+        SAFE_CAST(j.created_at AS TIMESTAMP) AS created_at
+    FROM raw.job_logs j
+    JOIN raw.users u ON u.id = j.worker_id
+    WHERE {where}
+"""
+
+# Role codes (index into ROLE_CATEGORIES) for every birth year x season end year, same rules as parse_role
+_ROLE_LOOKUP_BIRTH_YEARS = np.arange(1900, 2101)
+_ROLE_LOOKUP_SEASON_YEARS = np.arange(2000, 2101)
+_age = _ROLE_LOOKUP_SEASON_YEARS[None, :] - _ROLE_LOOKUP_BIRTH_YEARS[:, None]
+_ROLE_LOOKUP = np.select([_age < 14, _age <= 16, _age <= 18], [0, 1, 2], default=3).astype(np.int8)
+del _age
+
 class DatabaseModule(ABC):
     def __init__(self):
         self.start_date  = datetime(2025, 8, 1).date()
@@ -72,11 +184,19 @@ class DatabaseModule(ABC):
             logger.error(f"Error applying role for birth_date {birth_date}: {e}")
             return None
  
-    def filter_df_by_dates(self, df: pd.DataFrame, dates : tuple = (), date_col: str = "date_completed") -> pd.DataFrame:
-        if date_col not in df.columns:
+    def filter_df_by_dates(self, df: pd.DataFrame | DateIndexedFrame, dates : tuple = (), date_col: str = "date_completed") -> pd.DataFrame:
+        '''
+        Rows with date_col between the given dates (or the sidebar dates), both inclusive.
+        Pass a DateIndexedFrame to re-slice the same data without sorting it again.
+        The result is sorted by date_col and may be a view: copy it before modifying it in place.
+        '''
+        if isinstance(df, DateIndexedFrame):
+            dated = df
+        elif date_col not in df.columns:
             logger.warning(f"Date column {date_col} not found in DataFrame. Skipping date filtering.")
             return df
-        df["date_completed"] = pd.to_datetime(df["date_completed"], errors='coerce', utc=True)
+        else:
+            dated = DateIndexedFrame(df, date_col=date_col)
         if not dates:
             st_start_date = st.session_state.get("dates", [None, None])[0]
             st_end_date = st.session_state.get("dates", [None, None])[1]
@@ -87,20 +207,11 @@ class DatabaseModule(ABC):
         else:
             self.start_date, self.end_date = dates
 
-        # st.info(f"Filtering data by selected dates: {self.start_date} to {self.end_date}")
-        # st.info(f'MIN DATE IN DATA: {df[date_col].min()}, MAX DATE IN DATA: {df[date_col].max()}')
-        # st.info(f'Antall rader: {len(df)} før filtrering')
-        
         try:
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-            filtered_df = df[
-                (df[date_col].dt.date >= self.start_date) &
-                (df[date_col].dt.date <= self.end_date)
-            ].copy()
-            return filtered_df
+            return dated.slice(self.start_date, self.end_date)
         except Exception as e:
             logger.error(f"Error filtering DataFrame by dates: {e}")
-            return df
+            return dated.df
         
     def filter_work_type(self, df: pd.DataFrame, work_types : list = [], work_type_col: str = "work_type") -> pd.DataFrame:
         if work_type_col not in df.columns:
@@ -128,13 +239,61 @@ class DatabaseModule(ABC):
             return df
         
         if not every_sample:
-            dfg = df.groupby(GROUPING_COLS)[AGG_COLS].sum().reset_index()
+            dfg = df.groupby(GROUPING_COLS, observed=True)[AGG_COLS].sum().reset_index()
         else:
             cols = [col for col in ALL_COLS if col in df.columns]
             dfg = df[cols].copy()
         
         return dfg
 
+    def find_deviations(self,
+                        df : pd.DataFrame,
+                        threshold : float = 0.5,
+                        exclude_work_types : Tuple[str, ...] = ("annet_jobbhvit",),
+                        hour_limits : Optional[Dict[str, Tuple[float, float]]] = None) -> pd.DataFrame:
+        '''
+        Flag registrations with unusual hours, for all groups at once.
+
+        Args:
+            threshold: a registration is an outlier if hours_worked > median * (1 + threshold),
+                where the median is over all registrations with the same date_completed and work_type
+            exclude_work_types: work types that are never flagged as outliers
+            hour_limits: role -> (max hours on weekdays, max hours on weekends). Defaults to DEFAULT_HOUR_LIMITS.
+        Returns:
+            pd.DataFrame with one row per registration in a group with an outlier or above its hour limit.
+            Columns: date_completed, work_type, worker_name, role, hours_worked, group_median,
+            is_outlier, group_has_outlier, hour_limit, over_limit
+
+        Usage:
+            flags = api.find_deviations(df)
+            flags.loc[flags["group_has_outlier"]].groupby(["date_completed", "work_type"])
+        '''
+        hour_limits = DEFAULT_HOUR_LIMITS if hour_limits is None else hour_limits
+        keys = ["date_completed", "work_type"]
+        hours = df["hours_worked"]
+        grouped = df.groupby(keys, observed=True, sort=False)
+        group_median = grouped["hours_worked"].transform("median")
+        is_outlier = (hours > group_median * (1 + threshold)) & ~df["work_type"].isin(exclude_work_types)
+        # Rows with a missing date or work type are in no group (ngroup is NaN) and never group outliers
+        group_has_outlier = is_outlier.groupby(grouped.ngroup()).transform("any").reindex(df.index).eq(True)
+
+        roles = df["role"].astype(object) if "role" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        weekend = (df["date_completed"].dt.dayofweek >= 5).to_numpy()
+        weekday_limit = roles.map({role: limits[0] for role, limits in hour_limits.items()}).astype(float).to_numpy()
+        weekend_limit = roles.map({role: limits[1] for role, limits in hour_limits.items()}).astype(float).to_numpy()
+        hour_limit = np.where(weekend, weekend_limit, weekday_limit)
+        over_limit = hours.to_numpy() > hour_limit      # NaN limit (role without limit) is never exceeded
+
+        cols = [col for col in ["date_completed", "work_type", "worker_name", "role", "hours_worked"] if col in df.columns]
+        flags = df[cols].assign(
+            group_median=group_median,
+            is_outlier=is_outlier,
+            group_has_outlier=group_has_outlier,
+            hour_limit=hour_limit,
+            over_limit=over_limit,
+        )
+        return flags.loc[group_has_outlier.to_numpy() | over_limit].sort_values(keys, kind="stable")
+
     def render_metrics(self, df, df_raw):
         REQ_COLS = ["cost","hours_worked","worker_name","date_completed"]
         if not set(REQ_COLS).issubset(df.columns):
@@ -143,10 +302,9 @@ class DatabaseModule(ABC):
         delta_time = st.session_state.dates[1] - st.session_state.dates[0]
         delta_start = st.session_state.dates[0] - delta_time - timedelta(days=1)
         #st.info((delta_start, st.session_state.dates,delta_time))
-        delta_df = df_raw.loc[
-            (df_raw['date_completed'] >= pd.to_datetime(delta_start, utc=True)) &
-            (df_raw['date_completed'] < pd.to_datetime(st.session_state.dates[0], utc=True))
-            ].copy()
+        if not isinstance(df_raw, DateIndexedFrame):
+            df_raw = DateIndexedFrame(df_raw)
+        delta_df = df_raw.slice(delta_start, st.session_state.dates[0] - timedelta(days=1))
         cols = st.columns(3)
         cols[0].metric(label = "Total antall timer", value = f"{df['hours_worked'].sum():,.0f}", 
                     delta = f"{df['hours_worked'].sum() - delta_df['hours_worked'].sum():,.0f} fra forrige periode")
@@ -163,7 +321,7 @@ class DatabaseModule(ABC):
             str: gruppe, e.g. "genf", "hjelpementor", "mentor"
 
         Usage:
-            df['gruppe'] = df['work_type'].apply(lambda wt: self.mk_gruppe(wt))
+            df = self.add_work_type_dimension(df)
         '''
         if not work_type:
             return None
@@ -172,6 +330,43 @@ class DatabaseModule(ABC):
         if not work_type:
             return None
         return " ".join(work_type.split("_")[1:]) if "_" in work_type and len(work_type.split("_")) > 1 else work_type
+
+    @st.cache_data(ttl=86400, show_spinner=False)
+    def work_type_dimension(_self, work_types : tuple) -> pd.DataFrame:
+        '''
+        One row per distinct work_type with its gruppe and prosjekt (see mk_gruppe/mk_prosjekt).
+        Cached on the set of work types, so it is only rebuilt when a new work type shows up.
+        '''
+        return pd.DataFrame({
+            "work_type": list(work_types),
+            "gruppe": [_self.mk_gruppe(wt) for wt in work_types],
+            "prosjekt": [_self.mk_prosjekt(wt) for wt in work_types],
+        })
+
+    def add_work_type_dimension(self, df : pd.DataFrame, col : str = "work_type") -> pd.DataFrame:
+        '''
+        Add gruppe and prosjekt columns to df (in place) by parsing each distinct work_type once
+        and broadcasting the result back through the factorized codes.
+        If work_type is categorical, its codes are reused and gruppe/prosjekt are categoricals too.
+
+        Usage:
+            df = self.add_work_type_dimension(df)
+        '''
+        categorical = isinstance(df[col].dtype, pd.CategoricalDtype)
+        if categorical:
+            codes, uniques = df[col].cat.codes.to_numpy(), df[col].cat.categories
+        else:
+            codes, uniques = pd.factorize(df[col])
+        dim = self.work_type_dimension(tuple(uniques))
+        for name in ("gruppe", "prosjekt"):
+            # Trailing entry is picked by code -1 (missing work_type)
+            if categorical:
+                part_codes, parts = pd.factorize(dim[name], sort=True)
+                df[name] = pd.Categorical.from_codes(np.append(part_codes, -1).take(codes), categories=parts)
+            else:
+                values = np.append(dim[name].to_numpy(dtype=object), None)
+                df[name] = values.take(codes)
+        return df
     
     
     def apply_season(self, date_input : datetime | date) -> str:
@@ -187,7 +382,103 @@ class DatabaseModule(ABC):
             return f"{str(date_input.year)[2:4]}/{str(date_input.year+1)[2:4]}"
         else:
             return f"{str(date_input.year-1)[2:4]}/{str(date_input.year)[2:4]}"
-    
+
+    def apply_seasons(self, dates : pd.Series) -> pd.Series:
+        '''
+        Columnar version of apply_season.
+
+        Args:
+            dates: Series of dates, datetimes or "YYYY-MM-DD" strings
+        Returns:
+            pd.Series: categorical season column, e.g. "25/26". Missing or malformed dates give NaN
+
+        Usage:
+            df["season"] = self.apply_seasons(df["date_completed"])
+        '''
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            parsed = dates
+        else:
+            parsed = pd.to_datetime(dates, errors="coerce", utc=True)
+        n_malformed = int((parsed.isna() & dates.notna()).sum())
+        if n_malformed:
+            logger.warning(f"{n_malformed} dates could not be parsed. Season is set to None for these rows.")
+
+        valid = parsed.notna().to_numpy()
+        start_year = np.zeros(len(parsed), dtype=np.int64)
+        start_year[valid] = (parsed.dt.year - (parsed.dt.month < 8)).to_numpy()[valid]
+        years, codes = np.unique(start_year[valid], return_inverse=True)
+        all_codes = np.full(len(parsed), -1, dtype=np.int64)
+        all_codes[valid] = codes
+        categories = [f"{y % 100:02d}/{(y + 1) % 100:02d}" for y in years]
+        return pd.Series(pd.Categorical.from_codes(all_codes, categories=categories), index=dates.index, name="season")
+
+    def _season_end_years(self, season : str | pd.Series | None, n : int) -> np.ndarray:
+        '''
+        Args:
+            season: season on the format "25/26", a Series of seasons, or None for the current season
+            n: number of rows
+        Returns:
+            np.ndarray: the year each season ends in, e.g. 2026 for "25/26"
+        '''
+        current = int(f'20{self.get_current_season().split("/")[1][-2:]}')
+        if season is None or isinstance(season, str):
+            if not season:
+                logger.info("No season selected. Choosing current season as default")
+                return np.full(n, current)
+            parts = season.split("/")
+            if len(parts) != 2 or not parts[1].isdigit():
+                logger.warning(f"Season expected to have format 'year1/year2', got {season!r}. Selecting current season as default")
+                return np.full(n, current)
+            return np.full(n, int(f"20{parts[1][-2:]}"))
+
+        end = pd.to_numeric(season.astype("string").str.extract(r"^\d{2,4}/(\d{2,4})$")[0].str[-2:], errors="coerce")
+        n_malformed = int(end.isna().sum())
+        if n_malformed:
+            logger.warning(f"{n_malformed} seasons were missing or not on the format 'year1/year2'. Selecting current season as default")
+        return (2000 + end).fillna(current).to_numpy(dtype=np.int64)
+
+    def parse_roles(self, birth_years : pd.Series, season : str | pd.Series | None = None) -> pd.Series:
+        '''
+        Columnar version of parse_role, using a precomputed birth year x season lookup table.
+
+        Args:
+            birth_years: Series of birth years. Missing values give NaN
+            season: one season for all rows, a Series with a season per row, or None for the current season
+        Returns:
+            pd.Series: categorical role column with categories ROLE_CATEGORIES
+        '''
+        years = pd.to_numeric(birth_years, errors="coerce")
+        valid = years.notna().to_numpy()
+        birth_idx = np.clip(years.fillna(0).to_numpy(dtype=np.int64) - _ROLE_LOOKUP_BIRTH_YEARS[0], 0, len(_ROLE_LOOKUP_BIRTH_YEARS) - 1)
+        season_idx = np.clip(self._season_end_years(season, len(years)) - _ROLE_LOOKUP_SEASON_YEARS[0], 0, len(_ROLE_LOOKUP_SEASON_YEARS) - 1)
+        codes = np.where(valid, _ROLE_LOOKUP[birth_idx, season_idx], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=ROLE_CATEGORIES), index=birth_years.index, name="role")
+
+    def apply_roles(self, birth_dates : pd.Series, season : str | pd.Series | None = None) -> pd.Series:
+        '''
+        Columnar version of apply_role.
+
+        Args:
+            birth_dates: Series of dates, datetimes or "YYYY-MM-DD" strings
+            season: one season for all rows, a Series with a season per row, or None for the current season
+        Returns:
+            pd.Series: categorical role column. Missing or malformed birth dates give NaN
+
+        Usage:
+            df["role"] = self.apply_roles(df["date_of_birth"], season="25/26")
+        '''
+        if pd.api.types.is_datetime64_any_dtype(birth_dates):
+            parsed = birth_dates
+        else:
+            parsed = pd.to_datetime(birth_dates, errors="coerce", format="mixed")
+        n_missing = int(birth_dates.isna().sum())
+        n_malformed = int((parsed.isna() & birth_dates.notna()).sum())
+        if n_missing:
+            logger.warning(f"Birth date is missing for {n_missing} rows. Cannot determine role.")
+        if n_malformed:
+            logger.error(f"Could not parse birth date for {n_malformed} rows. Cannot determine role.")
+        return self.parse_roles(parsed.dt.year, season)
+
     def apply_cost(self,row : pd.Series, rates : list,) -> int:
         season = row["season"] if "season" in row else None
         for rate in rates:
@@ -214,133 +505,458 @@ class DatabaseModule(ABC):
             except TypeError as e:
                 logger.warning(f"Error calculating cost for row \n{row.to_dict()} \nand rate \n{rate}\n: {e}\n\n")
 
+    def _build_rate_table(self, rates : list | None) -> Tuple[pd.DataFrame, pd.Series]:
+        '''
+        Args:
+            rates: list of rate dicts, e.g. [{"season": "25/26", "genf": 100, "hjelpementor": 150, "mentor": 200, "vedsekk": 20}, ...]
+        Returns:
+            (prices, positions): numeric price table with one row per rates entry and one column per key,
+            and a Series mapping season -> row in prices (first entry wins, like apply_cost)
+        '''
+        table = pd.DataFrame(rates or [])
+        if table.empty:
+            return table, pd.Series(dtype="int64")
+        if "season" not in table.columns:
+            table["season"] = None
+        first = table.drop_duplicates(subset="season", keep="first")
+        positions = pd.Series(first.index.to_numpy(), index=first["season"].to_numpy())
+        prices = table.drop(columns=["season"]).apply(pd.to_numeric, errors="coerce")
+        return prices, positions
+
+    def calc_costs(self, df : pd.DataFrame, rates : list | None) -> Tuple[pd.Series, Dict[str, int]]:
+        '''
+        Columnar version of apply_cost for a whole DataFrame.
+
+        Args:
+            df: DataFrame with "role", "work_type", "hours_worked", "units_completed" and optionally "season"
+            rates: list of rate dicts, same format as for apply_cost
+        Returns:
+            (cost, missing): cost per row, and the number of rows per rule where a rate was missing
+
+        Usage:
+            df["cost"], missing = self.calc_costs(df, rates)
+        '''
+        for col in ["role", "work_type"]:
+            if col not in df.columns:
+                raise ValueError(f"'{col}' is missing from DataFrame!")
+            n_missing = int(df[col].isna().sum())
+            if n_missing:
+                raise ValueError(f"'{col}' is missing for {n_missing} rows!")
+
+        n = len(df)
+        prices, positions = self._build_rate_table(rates)
+        role = df["role"].to_numpy(dtype=object)
+        hours = pd.to_numeric(df["hours_worked"], errors="coerce").to_numpy(dtype=float)
+        units = pd.to_numeric(df["units_completed"], errors="coerce").to_numpy(dtype=float) if "units_completed" in df.columns else np.full(n, np.nan)
+
+        if prices.empty:
+            season_fallback = n
+            hourly_rate = np.full(n, np.nan)
+            vedsekk_rate = np.full(n, np.nan)
+        else:
+            # Same as apply_cost: a season without an entry in rates uses the last entry
+            season = df["season"].to_numpy(dtype=object) if "season" in df.columns else np.full(n, None, dtype=object)
+            row_pos = pd.Index(positions.index).get_indexer(season)
+            season_fallback = int((row_pos == -1).sum())
+            row_pos = np.where(row_pos == -1, len(prices) - 1, positions.to_numpy()[row_pos])
+
+            price_values = prices.to_numpy(dtype=float)
+            role_pos = prices.columns.get_indexer(role)
+            hourly_rate = np.where(role_pos >= 0, price_values[row_pos, np.clip(role_pos, 0, None)], np.nan)
+            vedsekk_rate = prices["vedsekk"].to_numpy(dtype=float)[row_pos] if "vedsekk" in prices.columns else np.full(n, np.nan)
+
+        is_u13 = role == "u13"
+        is_vedsekk = (df["work_type"].to_numpy(dtype=object) == "glenne_vedpakking") & (role == "genf") & ~is_u13
+        is_hourly = ~is_u13 & ~is_vedsekk
+
+        missing_vedsekk = is_vedsekk & np.isnan(vedsekk_rate)
+        cost = np.where(is_hourly, hours * hourly_rate, np.nan)
+        cost = np.where(is_vedsekk, units * np.where(missing_vedsekk, 15, vedsekk_rate), cost)
+        cost = np.where(is_u13, 0.0, cost)
+
+        missing = {
+            "season": season_fallback,
+            "hourly": int((is_hourly & np.isnan(hourly_rate)).sum()),
+            "vedsekk": int(missing_vedsekk.sum()),
+            "u13": int(is_u13.sum()),
+        }
+        if missing["season"]:
+            logger.warning(f"{missing['season']} rows have a season without rates. Using the last rates entry as default.")
+        if missing["hourly"]:
+            logger.warning(f"{missing['hourly']} rows are missing an hourly rate for their role. Cost is set to None.")
+        if missing["vedsekk"]:
+            logger.warning(f"{missing['vedsekk']} rows are missing vedsekk in rates. Adding 15 kr as default value.")
+        if missing["u13"]:
+            logger.info(f"{missing['u13']} rows have role 'u13'. Setting cost to 0.")
+        return pd.Series(cost, index=df.index, name="cost"), missing
+
 class BigQueryModule(DatabaseModule):
     def __init__(self, ):
         super().__init__()
         self.client = self._init_gcp_client()
 
     def _init_gcp_client(self):
-        credentials = service_account.Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"]
-        )
-        client = bigquery.Client(credentials=credentials)
-        return client
+        credentials_info = st.secrets["gcp_service_account"]
+
+        def build_client():
+            credentials = service_account.Credentials.from_service_account_info(credentials_info)
+            return bigquery.Client(credentials=credentials)
+
+        return client_registry.get("bigquery", credentials_info, build_client)
     
     @st.cache_data(ttl=3600,show_spinner=False)
-    def run_query(_self, query: str) -> pd.DataFrame:
-        query_job = _self.client.query(query)
+    def run_query(_self, query: str, params: tuple = ()) -> pd.DataFrame:
+        """
+        Args:
+            query: SQL, optionally with named @parameters
+            params: tuple of (name, bigquery type, value) as returned by build_registrations_query.
+                Array parameters use ("ARRAY<STRING>", tuple_of_values).
+        """
+        return _self._execute_query(query, params)
+
+    def _execute_query(self, query: str, params: tuple = ()) -> pd.DataFrame:
+        """Uncached run_query, for reads that must see the current state of the warehouse."""
+        job_config = None
+        if params:
+            query_parameters = []
+            for name, type_, value in params:
+                if type_.startswith("ARRAY<"):
+                    query_parameters.append(bigquery.ArrayQueryParameter(name, type_[6:-1], list(value)))
+                else:
+                    query_parameters.append(bigquery.ScalarQueryParameter(name, type_, value))
+            job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        query_job = self.client.query(query, job_config=job_config)
         df = query_job.result().to_dataframe()
         return df
+
+    def build_registrations_query(self,
+                                  columns : List[str] | None = None,
+                                  from_date : str | date | None = None,
+                                  to_date : str | date | None = None,
+                                  roles : List[str] | None = None,
+                                  work_types : List[str] | None = None) -> Tuple[str, tuple]:
+        """
+        Build a parameterized SELECT on registrations.seasons with only the requested columns and rows.
+
+        Args:
+            columns: columns to select, all columns if None
+            from_date, to_date: inclusive filter on date_completed
+            roles, work_types: only keep rows with these roles / work types
+        Returns:
+            (query, params): params can be passed straight to run_query
+
+        Usage:
+            query, params = self.build_registrations_query(columns=["worker_name", "cost"], roles=["genf"])
+            df = self.run_query(query, params)
+        """
+        if columns:
+            invalid = [c for c in columns if not _IDENTIFIER.match(c)]
+            if invalid:
+                raise ValueError(f"Invalid column name(s): {invalid}")
+        select = ", ".join(columns) if columns else "*"
+
+        where, params = [], []
+        if from_date:
+            where.append("date_completed >= @from_date")
+            params.append(("from_date", "TIMESTAMP", pd.Timestamp(from_date, tz="UTC").to_pydatetime()))
+        if to_date:
+            where.append("date_completed <= @to_date")
+            params.append(("to_date", "TIMESTAMP", pd.Timestamp(to_date, tz="UTC").to_pydatetime()))
+        if roles:
+            where.append("role IN UNNEST(@roles)")
+            params.append(("roles", "ARRAY<STRING>", tuple(roles)))
+        if work_types:
+            where.append("work_type IN UNNEST(@work_types)")
+            params.append(("work_types", "ARRAY<STRING>", tuple(work_types)))
+
+        query = f"SELECT {select} FROM registrations.seasons"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        return query, tuple(params)
     
-    def load_registrations(self,from_date : str | None = None , to_date : str | None = None) -> pd.DataFrame:
-        query = """SELECT * FROM registrations.seasons"""
-        if from_date and to_date:
-            query = f"""SELECT * FROM registrations.seasons
-                        WHERE date_completed >= '{from_date}' AND date_completed <= '{to_date}'"""
-        elif from_date and not to_date:
-            query = f"""SELECT * FROM registrations.seasons
-                        WHERE date_completed >= '{from_date}'"""
-        elif to_date and not from_date:
-            query = f"""SELECT * FROM registrations.seasons
-                        WHERE date_completed <= '{to_date}'"""
-        data = self.run_query(query)
-        data.replace({"<NA>": None, pd.NaT: None,np.nan : None}, inplace=True)
-        data["hours_worked"] = pd.to_numeric(data["hours_worked"], errors="coerce")
-        data["cost"] = pd.to_numeric(data["cost"], errors="coerce")
-        data["work_type"] = data["work_type"].fillna("unknown")
-        [HistoricalJobEntry.model_validate(record) for record in data.to_dict(orient="records")] if not data.empty else None
-        return data
+    def load_registrations(self,from_date : str | None = None , to_date : str | None = None,
+                           source : Literal["warehouse", "replica"] = "warehouse",
+                           columns : List[str] | None = None,
+                           roles : List[str] | None = None,
+                           work_types : List[str] | None = None,
+                           validation : ValidationMode = "off") -> pd.DataFrame:
+        """
+        Args:
+            from_date, to_date: optional inclusive date filter on date_completed
+            source: "warehouse" queries registrations.seasons, "replica" reads the local
+                Parquet replica (see RegistrationsReplica) and only pulls new rows from the warehouse.
+                Falls back to the warehouse if the replica can not be read or refreshed.
+            columns: only load these columns. Rows are only validated when all columns are loaded.
+            roles, work_types: only load rows with these roles / work types
+            validation: validation of the rows against HistoricalJobEntry. Off by default since
+                registrations.seasons is already validated on the way in.
+        """
+        if source == "replica":
+            try:
+                filters = [(col, "in", list(values)) for col, values in [("role", roles), ("work_type", work_types)] if values]
+                if from_date:
+                    filters.append(("date_completed", ">=", pd.Timestamp(from_date, tz="UTC")))
+                if to_date:
+                    filters.append(("date_completed", "<=", pd.Timestamp(to_date, tz="UTC")))
+                data = RegistrationsReplica(self).load(columns=columns, filters=filters or None)
+                return self._prepare_registrations(data, validation=validation if columns is None else "off")
+            except Exception as e:
+                logger.warning(f"Could not read registrations replica: {e}. Querying the warehouse instead.")
+
+        query, params = self.build_registrations_query(columns, from_date, to_date, roles, work_types)
+        data = self.run_query(query, params)
+        return self._prepare_registrations(data, validation=validation if columns is None else "off")
+
+    def load_registration_aggregates(self, roles : List[str] | None = None, cached : bool = True) -> pd.DataFrame:
+        """
+        Per worker, season, role, work type and month sums of registrations.seasons, computed in BigQuery.
+
+        date_completed is truncated to the first of the month, and gruppe/prosjekt are derived from
+        work_type the same way as mk_gruppe/mk_prosjekt, so the result can stand in for raw rows in
+        every cost/hours aggregation of the review pages.
+
+        Args:
+            roles: only aggregate rows with these roles
+            cached: go through run_query's cache. Pass False when the caller caches the result itself.
+        Returns:
+            pd.DataFrame with worker_name, season, role, work_type, date_completed, cost, hours_worked,
+            n_registrations, gruppe and prosjekt
+        """
+        where, params = "", ()
+        if roles:
+            where = "WHERE role IN UNNEST(@roles)"
+            params = (("roles", "ARRAY<STRING>", tuple(roles)),)
+        query = f"""
+            SELECT
+                *,
+                SPLIT(work_type, '_')[OFFSET(0)] AS gruppe,
+                IF(STRPOS(work_type, '_') > 0, REPLACE(SUBSTR(work_type, STRPOS(work_type, '_') + 1), '_', ' '), work_type) AS prosjekt
+            FROM (
+                SELECT
+                    worker_name,
+                    season,
+                    role,
+                    COALESCE(work_type, 'unknown') AS work_type,
+                    TIMESTAMP_TRUNC(date_completed, MONTH) AS date_completed,
+                    SUM(SAFE_CAST(cost AS FLOAT64)) AS cost,
+                    SUM(SAFE_CAST(hours_worked AS FLOAT64)) AS hours_worked,
+                    COUNT(*) AS n_registrations
+                FROM registrations.seasons
+                {where}
+                GROUP BY 1, 2, 3, 4, 5
+            )"""
+        data = self.run_query(query, params) if cached else self._execute_query(query, params)
+        return self._prepare_registrations(data)
+
+    def _prepare_registrations(self, data : pd.DataFrame, validation : ValidationMode = "off") -> pd.DataFrame:
+        for col in data.select_dtypes(include=["object", "string"]).columns:
+            data[col] = data[col].mask(data[col] == "<NA>")
+        for col in ["hours_worked", "cost"]:
+            if col in data.columns:
+                data[col] = pd.to_numeric(data[col], errors="coerce")
+        if "work_type" in data.columns:
+            data["work_type"] = data["work_type"].fillna("unknown")
+        if validation != "off" and not data.empty:
+            records = data.astype(object).where(data.notna(), None).to_dict(orient="records")
+            data.attrs["validation"] = validate_records(HistoricalJobEntry, records, mode=validation)
+        return compact_frame(data, label="registrations")
     
     
 
-    def transfer_to_hours(self, ):
+    def read_sync_watermark(self, name: str) -> Optional[dict]:
+        """
+        Last successfully synced (created_at, id) for a sync job, or None if it never ran.
+        """
+        try:
+            df = self._execute_query(
+                f"SELECT created_at, id FROM `{SYNC_WATERMARKS_TABLE_ID}` WHERE name = @name LIMIT 1",
+                (("name", "STRING", name),),
+            )
+        except Exception as e:
+            logger.warning(f"Could not read sync watermark for {name}: {e}")
+            return None
+        if df.empty or pd.isna(df["created_at"].iloc[0]):
+            return None
+        return {"created_at": pd.Timestamp(df["created_at"].iloc[0]), "id": df["id"].iloc[0] or ""}
+
+    def write_sync_watermark(self, name: str, created_at: pd.Timestamp, id: str):
+        script = _SYNC_WATERMARKS_DDL + f"""
+            MERGE `{SYNC_WATERMARKS_TABLE_ID}` T
+            USING (SELECT @name AS name, @created_at AS created_at, @id AS id) S
+            ON T.name = S.name
+            WHEN MATCHED THEN
+            UPDATE SET T.created_at = S.created_at, T.id = S.id, T.synced_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN
+            INSERT (name, created_at, id, synced_at) VALUES (S.name, S.created_at, S.id, CURRENT_TIMESTAMP());
+        """
+        self._execute_query(script, (
+            ("name", "STRING", name),
+            ("created_at", "TIMESTAMP", pd.Timestamp(created_at).to_pydatetime()),
+            ("id", "STRING", id),
+        ))
+
+    def _job_logs_delta_filter(self,
+                               mode: Literal["full", "incremental"],
+                               lookback: timedelta) -> Tuple[str, tuple, Optional[dict]]:
+        """
+        WHERE clause selecting the job logs (alias j) that have to be moved to raw.hours.
+
+        full        – every job log without a row in raw.hours (anti-join against the whole table).
+        incremental – job logs created after the watermark minus lookback. Rows that were already
+                      transferred are upserted again by the MERGE, so overlap is harmless.
+        Falls back to full if there is no watermark yet.
+        """
+        watermark = self.read_sync_watermark("transfer_to_hours") if mode == "incremental" else None
+        if watermark is None:
+            if mode == "incremental":
+                logger.info("No sync watermark found for transfer_to_hours. Running a full transfer.")
+            return f"NOT EXISTS (SELECT 1 FROM `{HOURS_TABLE_ID}` h WHERE h.id = j.id)", (), None
+        since = watermark["created_at"] - lookback
+        where = ("(SAFE_CAST(j.created_at AS TIMESTAMP) > @since "
+                 "OR (SAFE_CAST(j.created_at AS TIMESTAMP) = @since AND j.id > @since_id))")
+        params = (
+            ("since", "TIMESTAMP", since.to_pydatetime()),
+            ("since_id", "STRING", watermark["id"] if not lookback else ""),
+        )
+        return where, params, watermark
+
+    def _advance_sync_watermark(self, df: pd.DataFrame, previous: Optional[dict]):
+        created_at = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
+        if created_at.isna().all():
+            return
+        last = df.assign(created_at=created_at).sort_values(["created_at", "id"]).iloc[-1]
+        new = {"created_at": last["created_at"], "id": str(last["id"])}
+        if previous is not None and (previous["created_at"], previous["id"]) > (new["created_at"], new["id"]):
+            return
+        self.write_sync_watermark("transfer_to_hours", new["created_at"], new["id"])
+
+    @staticmethod
+    def _hours_merge_sql(source: str) -> str:
+        """MERGE source (a table or subquery with the raw.hours columns) into raw.hours on id."""
+        return f"""
+            MERGE `{HOURS_TABLE_ID}` T
+            USING {source} S
+            ON T.id = S.id
+            
+            WHEN MATCHED THEN
+            UPDATE SET 
+                T.worker_id = S.worker_id,
+                T.work_type = S.work_type,
+                T.date_completed = S.date_completed,
+                T.hours_worked = S.hours_worked,
+                T.units_completed = S.units_completed,
+                T.role = S.role,
+                T.date_of_birth = S.date_of_birth,
+                T.comments = S.comments,
+                T.work_leader = S.work_leader,
+                T.work_type_id = S.work_type_id,
+                T.worker_name = S.worker_name,
+                T.season = S.season
+                
+            WHEN NOT MATCHED THEN
+            INSERT (id, worker_id, work_type, date_completed, hours_worked, units_completed, role, date_of_birth, comments, work_leader, work_type_id, worker_name, season)
+            VALUES (S.id, S.worker_id, S.work_type, S.date_completed, S.hours_worked, S.units_completed, S.role, S.date_of_birth, S.comments, S.work_leader, S.work_type_id, S.worker_name, S.season)
+        """
+
+    def transfer_to_hours(self,
+                          mode: Literal["full", "incremental"] = "incremental",
+                          lookback: timedelta = timedelta(days=14),
+                          engine: Literal["sql", "pandas"] = "sql") -> int:
+        """
+        Move job logs from raw.job_logs to raw.hours.
+
+        Args:
+            mode: "incremental" only reads job logs created since the last successful sync (minus lookback),
+                "full" compares all of raw.job_logs against raw.hours.
+            lookback: re-read window before the watermark, for job logs uploaded to raw.job_logs late.
+            engine: "sql" transforms and merges inside BigQuery in one script job. "pandas" downloads the
+                job logs, transforms them in pandas and loads them through raw.hours_staging.
+                The pandas path is also used as a fallback if the SQL script fails.
+        Returns:
+            number of job logs merged into raw.hours
+        """
+        where, params, watermark = self._job_logs_delta_filter(mode, lookback)
+        if engine == "sql":
+            try:
+                return self._transfer_to_hours_sql(where, params)
+            except Exception as e:
+                logger.warning(f"SQL transfer to hours failed, falling back to pandas: {e}")
+        return self._transfer_to_hours_pandas(where, params, watermark)
+
+    def _transfer_to_hours_sql(self, where: str, params: tuple) -> int:
+        script = f"""
+            CREATE TEMP TABLE delta AS {_HOURS_FROM_JOB_LOGS_SQL.format(where=where)};
+            {self._hours_merge_sql("delta")};
+            {_SYNC_WATERMARKS_DDL}
+            MERGE `{SYNC_WATERMARKS_TABLE_ID}` T
+            USING (
+                SELECT 'transfer_to_hours' AS name, created_at, id FROM delta
+                WHERE created_at IS NOT NULL
+                ORDER BY created_at DESC, id DESC LIMIT 1
+            ) S
+            ON T.name = S.name
+            WHEN MATCHED AND (S.created_at > T.created_at OR (S.created_at = T.created_at AND S.id > T.id)) THEN
+            UPDATE SET T.created_at = S.created_at, T.id = S.id, T.synced_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN
+            INSERT (name, created_at, id, synced_at) VALUES (S.name, S.created_at, S.id, CURRENT_TIMESTAMP());
+            SELECT COUNT(*) AS n FROM delta;
+        """
+        n = int(self._execute_query(script, params)["n"].iloc[0])
+        logger.info(f"Transferred {n} job logs to hours in BigQuery.")
+        return n
+
+    def _transfer_to_hours_pandas(self, where: str, params: tuple, watermark: Optional[dict]) -> int:
         #read
-        dfh = self.run_query("SELECT * FROM raw.hours LIMIT 5")
-        query = """SELECT 
+        query = f"""SELECT 
                         j.*,
                         u.date_of_birth,
                         u.age_category
                         FROM raw.job_logs j
                         JOIN raw.users u ON u.id = j.worker_id
-                        WHERE NOT EXISTS 
-                        (SELECT 1 FROM raw.hours h WHERE h.id = j.id)
+                        WHERE {where}
                         """
-        df = self.run_query(query)
+        df = self._execute_query(query, params)
         if not isinstance(df, pd.DataFrame):
             logger.error(f"Query did not return a DataFrame. Got {type(df)} instead.")
-            return 
+            return 0
         if df.empty:
             logger.info("No new job logs to transfer to hours.")
-            return
+            return 0
+        delta = df[["created_at", "id"]].copy()
 
         #transform
         role_map = {"O18" : "mentor", "U18" : "hjelpementor", "U16" : "genf"}
-        df["age_category"] = df["age_category"].apply(lambda x : role_map.get(x, "unknown"))
+        df["age_category"] = df["age_category"].map(role_map).fillna("unknown")
         df.rename(columns={"age_category": "role"}, inplace=True)
 
-        df["worker_name"] = df["worker_first_name"] + " " + df["worker_last_name"]
         df["worker_name"] = df["worker_first_name"] + " " + df["worker_last_name"]
         df["date_completed"] = pd.to_datetime(df["date_completed"], unit="s", utc=True).astype("datetime64[us, UTC]")
         df["date_of_birth"] = pd.to_datetime(df["date_of_birth"], utc=True).astype("datetime64[us, UTC]")
-        drop = list(set(df.columns) - set(dfh.columns))
+        drop = list(set(df.columns) - {field.name for field in HOURS_STAGING_SCHEMA})
         df.drop(columns=drop, inplace=True)
-        df["season"] = df["date_completed"].apply(lambda x: self.apply_season(x))
+        df["season"] = self.apply_seasons(df["date_completed"]).astype(object)
 
         #load
-        staging_table_id = "genf-446213.raw.hours_staging"
-        main_table_id = "genf-446213.raw.hours"
         try:
-            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE",
-                                                schema = [bigquery.SchemaField("id", "STRING"),
-                                                        bigquery.SchemaField("worker_id", "STRING"),
-                                                        bigquery.SchemaField("work_type", "STRING"),
-                                                        bigquery.SchemaField("date_completed", "TIMESTAMP"),
-                                                        bigquery.SchemaField("hours_worked", "FLOAT"),
-                                                        bigquery.SchemaField("units_completed", "INTEGER"),
-                                                        bigquery.SchemaField("comments", "STRING"),
-                                                        bigquery.SchemaField("role", "STRING"),
-                                                        bigquery.SchemaField("date_of_birth", "TIMESTAMP"),
-                                                        bigquery.SchemaField("work_leader", "STRING"),
-                                                        bigquery.SchemaField("work_type_id", "STRING"),
-                                                        bigquery.SchemaField("worker_name", "STRING")
-                                                        ])
-            
-            load_job = self.client.load_table_from_dataframe(df, staging_table_id, job_config=job_config)
+            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE", schema=HOURS_STAGING_SCHEMA)
+            load_job = self.client.load_table_from_dataframe(df, HOURS_STAGING_TABLE_ID, job_config=job_config)
             load_job.result()
-            print("Data loaded to staging table successfully.")
+            logger.info("Data loaded to staging table successfully.")
         except Exception as e:
-            print(f"Error loading data to staging table: {e}")
+            logger.error(f"Error loading data to staging table: {e}")
+            return 0
 
-        merge_sql = f"""
-            MERGE `{main_table_id}` T
-            USING `{staging_table_id}` S
-            ON T.id = S.id
-            
-            WHEN MATCHED THEN
-            UPDATE SET 
-                T.worker_id = S.worker_id,
-                T.work_type = S.work_type,
-                T.date_completed = S.date_completed,
-                T.hours_worked = S.hours_worked,
-                T.units_completed = S.units_completed,
-                T.role = S.role,
-                T.date_of_birth = S.date_of_birth,
-                T.comments = S.comments,
-                T.work_leader = S.work_leader,
-                T.work_type_id = S.work_type_id,
-                T.worker_name = S.worker_name
-                
-            WHEN NOT MATCHED THEN
-            INSERT (id, worker_id, work_type, date_completed, hours_worked, units_completed, role, date_of_birth, comments, work_leader, work_type_id, worker_name)
-            VALUES (S.id, S.worker_id, S.work_type, S.date_completed, S.hours_worked, S.units_completed, S.role, S.date_of_birth, S.comments, S.work_leader, S.work_type_id, S.worker_name)
-        """
         try:
             query_config = bigquery.QueryJobConfig()
-            query_job = self.client.query(merge_sql, job_config=query_config)
+            query_job = self.client.query(self._hours_merge_sql(f"`{HOURS_STAGING_TABLE_ID}`"), job_config=query_config)
             query_job.result()
-            print("Merge completed successfully.")
+            logger.info("Merge completed successfully.")
         except Exception as e:
-            print(f"Error during merge: {e}")
+            logger.error(f"Error during merge: {e}")
+            return 0
+
+        self._advance_sync_watermark(delta, watermark)
+        return len(df)
     
     def load_rates(self):
         query = """SELECT * FROM admin.rates"""
@@ -357,44 +973,125 @@ class BigQueryModule(DatabaseModule):
         data = self.run_query(query)
         return data
     
-    def get_season_count(self,):
-        df = self.client.query("""SELECT DISTINCT season FROM raw.hours""").to_dataframe()
-        seasons = df["season"].tolist()
+    @st.cache_data(ttl=TABLE_VERSION_TTL, show_spinner=False)
+    def _table_versions(_self, *table_ids : str) -> tuple:
+        """
+        Last modified time of each table, used as cache keys. Memoized for TABLE_VERSION_TTL seconds,
+        so reruns don't wait for a metadata call per table.
+        """
+        return tuple(_self.client.get_table(table_id).modified.isoformat() for table_id in table_ids)
+
+    def get_season_count(self) -> pd.DataFrame:
+        """
+        Number of members per season and role, as if every member registered in members.all was active in every season in raw.hours.
+        Cached until members.all or raw.hours is modified.
 
-        y = self.client.query('''SELECT 
+        Returns:
+            pd.DataFrame with columns season, role, count
+        """
+        try:
+            version = self._table_versions("members.all", "raw.hours")
+        except Exception as e:
+            logger.warning(f"Could not read table metadata, computing season count without cache: {e}")
+            return self._compute_season_count()
+        return self._cached_season_count(version)
+
+    @st.cache_data(show_spinner=False)
+    def _cached_season_count(_self, version : tuple) -> pd.DataFrame:
+        return _self._compute_season_count()
+
+    def _compute_season_count(self) -> pd.DataFrame:
+        seasons = self.client.query("""SELECT DISTINCT season FROM raw.hours WHERE season IS NOT NULL""").to_dataframe()["season"]
+        births = self.client.query('''SELECT 
             EXTRACT(YEAR FROM birthdate) AS birth_year, 
             COUNT(*) AS count
         FROM `members.all`
         GROUP BY birth_year
         ORDER BY birth_year;''').to_dataframe()
 
-        result = {}
-        for season in seasons:
-            y["role"] = y["birth_year"].apply(lambda x : self.parse_role(x, season))
-            result[season] = y.groupby("role").agg({"count" : "sum"}).reset_index()
-        r = pd.concat(result).reset_index()
-        r.drop(columns=["level_1"], inplace=True)
-        r.rename({"level_0" : "season",}, inplace=True, axis=1)
-        return r
+        # seasons x birth years in one frame, roles from the birth year x season lookup table
+        n_seasons, n_births = len(seasons), len(births)
+        cross = pd.DataFrame({
+            "season": np.repeat(seasons.to_numpy(dtype=object), n_births),
+            "birth_year": np.tile(births["birth_year"].to_numpy(), n_seasons),
+            "count": np.tile(births["count"].to_numpy(), n_seasons),
+        })
+        cross["role"] = self.parse_roles(cross["birth_year"], cross["season"])
+        return cross.groupby(["season", "role"], observed=True)["count"].sum().reset_index()
     
-    def load_camp_rates(self):
+    def load_camp_rates(self, cached : bool = True):
         query = """SELECT * FROM admin.camp_rates"""
-        data = self.run_query(query)
+        data = self.run_query(query) if cached else self._execute_query(query)
         return data
 
+    def get_table_schema(self, full_table_id: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Column name -> BigQuery type for full_table_id, cached for SCHEMA_CACHE_TTL seconds.
+
+        Args:
+            columns: columns the caller is about to write. If any of them is missing from the cached
+                schema, the schema is fetched again in case the table has changed.
+        Returns:
+            None if the table doesn't exist
+        """
+        with _schema_cache_lock:
+            cached = _schema_cache.get(full_table_id)
+        if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+            if columns is None or set(columns) <= set(cached[1]):
+                return cached[1]
+        try:
+            table = self.client.get_table(full_table_id)
+        except Exception:
+            self.invalidate_table_schema(full_table_id)
+            return None
+        schema = {field.name: field.field_type for field in table.schema}
+        with _schema_cache_lock:
+            _schema_cache[full_table_id] = (time.monotonic(), schema)
+        return schema
+
+    @staticmethod
+    def invalidate_table_schema(full_table_id: Optional[str] = None):
+        """Drop the cached schema of full_table_id, or of all tables if None."""
+        with _schema_cache_lock:
+            if full_table_id is None:
+                _schema_cache.clear()
+            else:
+                _schema_cache.pop(full_table_id, None)
+
+    @staticmethod
+    def _to_epoch_seconds(parsed: pd.Series) -> pd.Series:
+        # Same as int(x.timestamp()): naive datetimes are taken as UTC, truncated towards zero
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_convert("UTC").dt.tz_localize(None)
+        seconds = (parsed - pd.Timestamp("1970-01-01")).dt.total_seconds()
+        return np.trunc(seconds).astype("Int64")
+
+    @staticmethod
+    def _to_bool(values: pd.Series) -> pd.Series:
+        # Strings are true if they read "true", "1" or "yes", other values by truthiness, missing stays missing
+        result = pd.Series(pd.NA, index=values.index, dtype="boolean")
+        if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            present = values.notna()
+            result[present] = values[present].astype(bool)
+            return result
+        strings = values.str.strip().str.lower() if values.dtype == object else pd.Series(np.nan, index=values.index)
+        is_string = strings.notna()
+        result[is_string] = strings[is_string].isin(_TRUE_STRINGS)
+        other = ~is_string & values.notna()
+        result[other] = values[other].astype(bool)
+        return result
+
     def _coerce_df_to_schema(self, df: pd.DataFrame, full_table_id: str) -> pd.DataFrame:
         """
         Coerce DataFrame column dtypes to match an existing BigQuery table schema.
         If the table doesn't exist yet, returns the DataFrame unchanged.
         Unknown/extra columns are left as-is.
         """
-        try:
-            table = self.client.get_table(full_table_id)
-        except Exception:
+        type_map = self.get_table_schema(full_table_id, columns=list(df.columns))
+        if type_map is None:
             return df  # Table doesn't exist yet — let BQ autodetect
 
         df = df.copy()
-        type_map = {field.name: field.field_type for field in table.schema}
 
         for col in df.columns:
             bq_type = type_map.get(col)
@@ -406,12 +1103,10 @@ class BigQueryModule(DatabaseModule):
                         # pandas uses float64 for nullable int columns — convert back to Int64
                         df[col] = df[col].astype("Int64")
                     elif not pd.api.types.is_integer_dtype(df[col]):
-                        parsed = pd.to_datetime(df[col], errors="coerce")
+                        parsed = pd.to_datetime(df[col], errors="coerce", utc=True)
                         if parsed.notna().any() and df[col].dtype == object:
                             # Only treat object columns as datetime-like, not floats
-                            df[col] = parsed.apply(
-                                lambda x: int(x.timestamp()) if pd.notna(x) else None
-                            )
+                            df[col] = self._to_epoch_seconds(parsed)
                             logger.info(f"Coerced '{col}' to epoch seconds (INT64) to match BQ schema.")
                         else:
                             df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
@@ -424,13 +1119,7 @@ class BigQueryModule(DatabaseModule):
                 elif bq_type == "DATE":
                     df[col] = pd.to_datetime(df[col], errors="coerce").dt.date
                 elif bq_type in ("BOOL", "BOOLEAN"):
-                    df[col] = df[col].apply(
-                        lambda x: x.strip().lower() in ("true", "1", "yes")
-                        if isinstance(x, str)
-                        else bool(x)
-                        if x is not None
-                        else None
-                    )
+                    df[col] = self._to_bool(df[col])
                 elif bq_type == "STRING":
                     df[col] = df[col].where(df[col].isna(), df[col].astype(str))
             except Exception as e:
@@ -438,6 +1127,109 @@ class BigQueryModule(DatabaseModule):
 
         return df
 
+    @staticmethod
+    def _to_arrow(df: pd.DataFrame, type_map: Optional[Dict[str, str]] = None) -> pa.Table:
+        """Arrow table with the column types of the target BigQuery table, inferred for unknown columns."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, name in enumerate(table.column_names):
+            target = _ARROW_TYPES.get((type_map or {}).get(name))
+            if target is None or table.schema.field(i).type == target:
+                continue
+            try:
+                table = table.set_column(i, pa.field(name, target), table.column(i).cast(target))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                logger.warning(f"Could not cast '{name}' to {target}, keeping {table.schema.field(i).type}: {e}")
+        return table
+
+    def load_parquet_file(self, source: Union[str, Path, io.BytesIO], table_id: str,
+                          write_disposition: str = "WRITE_APPEND", retries: int = 2) -> int:
+        """
+        Load one Parquet file or buffer into table_id. Retries failed load jobs from the same bytes.
+        Use it to retry a file left in staging_dir by a failed write_df.
+        """
+        job_config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.PARQUET, write_disposition=write_disposition)
+        for attempt in range(retries + 1):
+            try:
+                if isinstance(source, io.BytesIO):
+                    job = self.client.load_table_from_file(source, table_id, job_config=job_config, rewind=True)
+                else:
+                    with open(source, "rb") as f:
+                        job = self.client.load_table_from_file(f, table_id, job_config=job_config)
+                job.result()
+                return job.output_rows or 0
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                logger.warning(f"Load to {table_id} failed (attempt {attempt + 1}/{retries + 1}): {e}. Retrying.")
+
+    def load_parquet(self,
+                     df: pd.DataFrame,
+                     table_id: str,
+                     write_disposition: str = "WRITE_APPEND",
+                     type_map: Optional[Dict[str, str]] = None,
+                     chunk_rows: int = WRITE_CHUNK_ROWS,
+                     max_workers: int = 4,
+                     staging_dir: Optional[Union[str, Path]] = None) -> int:
+        """
+        Load df into table_id as compressed Parquet, in chunks of at most chunk_rows rows.
+
+        Only one chunk is serialized per worker at a time, so memory is bounded by chunk_rows * max_workers.
+        With more than one chunk, the chunks are loaded into a staging table (<table>__load_<timestamp>)
+        that is then copied to table_id in a single copy job with write_disposition, so the target is
+        either fully written or untouched: a failed chunk never leaves it truncated or partially appended.
+
+        Args:
+            type_map: column -> BigQuery type, used to give the Parquet columns explicit Arrow types
+            staging_dir: write each chunk to a Parquet file here first. Files are removed after a
+                successful load and kept (for load_parquet_file) if it fails.
+        Returns:
+            number of rows loaded
+        """
+        if staging_dir is not None:
+            staging_dir = Path(staging_dir)
+            staging_dir.mkdir(parents=True, exist_ok=True)
+        stamp = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+        bounds = [(start, min(start + chunk_rows, len(df))) for start in range(0, max(len(df), 1), chunk_rows)]
+
+        def load_chunk(i: int, disposition: str, target: str) -> int:
+            start, end = bounds[i]
+            table = self._to_arrow(df.iloc[start:end], type_map)
+            if staging_dir is None:
+                buffer = io.BytesIO()
+                pq.write_table(table, buffer, compression=PARQUET_COMPRESSION)
+                self.load_parquet_file(buffer, target, disposition)
+                return end - start
+            path = staging_dir / f"{table_id.split('.')[-1]}_{stamp}_{i:04d}.parquet"
+            pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+            try:
+                self.load_parquet_file(path, target, disposition)
+            except Exception:
+                logger.error(f"Load of {path} to {target} failed. The file is kept for a retry with load_parquet_file.")
+                raise
+            path.unlink()
+            return end - start
+
+        def load_all(target: str, disposition: str) -> int:
+            # The first chunk sets the disposition, the others append in parallel
+            n = load_chunk(0, disposition, target)
+            if len(bounds) > 1:
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(bounds) - 1))) as pool:
+                    n += sum(pool.map(lambda i: load_chunk(i, "WRITE_APPEND", target), range(1, len(bounds))))
+            return n
+
+        if len(bounds) > 1:
+            staging_table_id = f"{table_id}__load_{stamp}"
+            try:
+                n = load_all(staging_table_id, "WRITE_TRUNCATE")
+                copy_config = bigquery.CopyJobConfig(write_disposition=write_disposition)
+                self.client.copy_table(staging_table_id, table_id, job_config=copy_config).result()
+            finally:
+                self.client.delete_table(staging_table_id, not_found_ok=True)
+        else:
+            n = load_all(table_id, write_disposition)
+        logger.info(f"Loaded {n} rows to {table_id} in {len(bounds)} Parquet chunk(s).")
+        return n
+
     def write_df(
         self,
         df: pd.DataFrame,
@@ -445,6 +1237,10 @@ class BigQueryModule(DatabaseModule):
         write_type: Literal["append", "replace", "merge"] = "append",
         project_id: str = "genf-446213",
         merge_on: Union[str, List[str]] = "id",
+        chunk_rows: int = WRITE_CHUNK_ROWS,
+        max_workers: int = 4,
+        staging_dir: Optional[Union[str, Path]] = None,
+        detect_changes: bool = False,
     ) -> int:
         """
         Skriver df til BigQuery. Returnerer antall rader skrevet.
@@ -452,6 +1248,16 @@ class BigQueryModule(DatabaseModule):
         append  – inserter bare rader nyere enn MAX(date_completed) i måltabellen.
         replace – WRITE_TRUNCATE: sletter og skriver alt på nytt.
         merge   – upsert via temp-tabell + MERGE SQL på merge_on.
+
+        Rader lastes som Parquet i biter på chunk_rows rader, max_workers om gangen (se load_parquet).
+        Med staging_dir skrives bitene til disk først, og blir liggende der hvis lastingen feiler.
+
+        merge med detect_changes=True sammenligner en hash per rad med hashene i <tabell>__row_hashes
+        og laster bare opp nye og endrede rader. Antall inserted/updated/unchanged ligger i last_write_stats.
+        Bruk det bare for tabeller som ikke endres utenom write_df: rader som endres eller slettes
+        på annen måte blir regnet som uendret og sendes ikke på nytt.
+        replace og merge uten detect_changes sletter <tabell>__row_hashes, siden hashene da ikke lenger
+        stemmer. append endrer ikke eksisterende rader, så hashene beholdes.
         """
         full_table_id = f"{project_id}.{target_table}"
         keys = [merge_on] if isinstance(merge_on, str) else merge_on
@@ -459,16 +1265,124 @@ class BigQueryModule(DatabaseModule):
         df_clean = df.copy()
         for col in df_clean.select_dtypes(include=["datetimetz"]).columns:
             df_clean[col] = df_clean[col].dt.tz_localize(None)
+        for col in df_clean.select_dtypes(include=["category"]).columns:
+            df_clean[col] = df_clean[col].astype(object)
 
         # Coerce dtypes to match the existing BQ table schema (prevents type mismatch errors)
         df_clean = self._coerce_df_to_schema(df_clean, full_table_id)
 
+        try:
+            load = lambda frame, table_id, disposition: self.load_parquet(
+                frame, table_id, disposition,
+                type_map=self.get_table_schema(full_table_id),
+                chunk_rows=chunk_rows, max_workers=max_workers, staging_dir=staging_dir,
+            )
+            self.last_write_stats = None
+            if write_type == "merge" and detect_changes:
+                n = self._merge_changed_rows(df_clean, full_table_id, keys, load)
+            else:
+                n = self._write_coerced_df(df_clean, full_table_id, write_type, keys, load)
+        except Exception:
+            # The cached schema may be the reason the load failed
+            self.invalidate_table_schema(full_table_id)
+            raise
         if write_type == "replace":
-            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
-            self.client.load_table_from_dataframe(
-                df_clean, full_table_id, job_config=job_config
-            ).result()
-            return len(df_clean)
+            self.invalidate_table_schema(full_table_id)
+            # Stored row hashes no longer describe the table (merge drops them in its own script)
+            self.client.delete_table(self._row_hash_table_id(full_table_id), not_found_ok=True)
+        return n
+
+    @staticmethod
+    def _row_hash_table_id(full_table_id: str) -> str:
+        return f"{full_table_id}__row_hashes"
+
+    @staticmethod
+    def row_hashes(df: pd.DataFrame) -> np.ndarray:
+        """Stable 64-bit content hash per row, independent of column order."""
+        hashes = pd.util.hash_pandas_object(df[sorted(df.columns)], index=False)
+        return hashes.to_numpy().view(np.int64)
+
+    def _read_row_hashes(self, hash_table_id: str, keys: List[str], df: pd.DataFrame) -> pd.DataFrame:
+        try:
+            if len(keys) == 1:
+                return self._execute_query(
+                    f"SELECT {keys[0]}, row_hash FROM `{hash_table_id}` WHERE CAST({keys[0]} AS STRING) IN UNNEST(@keys)",
+                    (("keys", "ARRAY<STRING>", tuple(df[keys[0]].astype(str).unique())),),
+                )
+            return self._execute_query(f"SELECT {', '.join(keys)}, row_hash FROM `{hash_table_id}`")
+        except Exception as e:
+            logger.info(f"No stored row hashes in {hash_table_id} ({e}). Treating all rows as new.")
+            return pd.DataFrame(columns=keys + ["row_hash"])
+
+    def _merge_changed_rows(self,
+                            df_clean: pd.DataFrame,
+                            full_table_id: str,
+                            keys: List[str],
+                            load: Callable[[pd.DataFrame, str, str], int]) -> int:
+        missing = [k for k in keys if k not in df_clean.columns]
+        if missing:
+            raise ValueError(f"merge_on kolonne(r) mangler i df: {missing}")
+        hash_table_id = self._row_hash_table_id(full_table_id)
+
+        row_hash = self.row_hashes(df_clean)
+        stored = self._read_row_hashes(hash_table_id, keys, df_clean)
+        key_strings = df_clean[keys].astype(str).agg("|".join, axis=1) if len(keys) > 1 else df_clean[keys[0]].astype(str)
+        stored_keys = stored[keys].astype(str).agg("|".join, axis=1) if len(keys) > 1 else stored[keys[0]].astype(str)
+        stored_hash = pd.Series(stored["row_hash"].astype("Int64").array, index=stored_keys.to_numpy())
+        stored_hash = stored_hash[~stored_hash.index.duplicated(keep="last")]
+        # reindex keeps Int64 (map would go through float64 and lose the low bits of the hash)
+        previous = stored_hash.reindex(key_strings.to_numpy())
+
+        is_new = previous.isna().to_numpy()
+        is_changed = ~is_new & (previous.fillna(0).to_numpy(dtype=np.int64) != row_hash)
+        self.last_write_stats = {
+            "inserted": int(is_new.sum()),
+            "updated": int(is_changed.sum()),
+            "unchanged": int((~is_new & ~is_changed).sum()),
+        }
+        upload = df_clean.loc[is_new | is_changed]
+        if upload.empty:
+            logger.info(f"No changed rows for {full_table_id}: {self.last_write_stats}")
+            return 0
+
+        temp_table_id = f"{full_table_id}_temp_{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+        load(upload.assign(_row_hash=row_hash[is_new | is_changed]), temp_table_id, "WRITE_TRUNCATE")
+
+        on_clause = " AND ".join(f"T.{k} = S.{k}" for k in keys)
+        update_cols = ", ".join(f"T.{c} = S.{c}" for c in upload.columns if c not in keys)
+        insert_cols = ", ".join(upload.columns)
+        insert_vals = ", ".join(f"S.{c}" for c in upload.columns)
+        key_cols = ", ".join(keys)
+        try:
+            self.client.query(f"""
+                MERGE `{full_table_id}` T
+                USING `{temp_table_id}` S
+                ON {on_clause}
+                WHEN MATCHED THEN UPDATE SET {update_cols}
+                WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals});
+
+                CREATE TABLE IF NOT EXISTS `{hash_table_id}` AS
+                SELECT {key_cols}, _row_hash AS row_hash FROM `{temp_table_id}` LIMIT 0;
+
+                MERGE `{hash_table_id}` T
+                USING (SELECT {key_cols}, _row_hash AS row_hash FROM `{temp_table_id}`) S
+                ON {on_clause}
+                WHEN MATCHED THEN UPDATE SET T.row_hash = S.row_hash
+                WHEN NOT MATCHED THEN INSERT ({key_cols}, row_hash) VALUES ({", ".join(f"S.{k}" for k in keys)}, S.row_hash);
+            """).result()
+        finally:
+            self.client.delete_table(temp_table_id, not_found_ok=True)
+        logger.info(f"Merged {len(upload)} rows into {full_table_id}: {self.last_write_stats}")
+        return len(upload)
+
+    def _write_coerced_df(self,
+                          df_clean: pd.DataFrame,
+                          full_table_id: str,
+                          write_type: str,
+                          keys: List[str],
+                          load: Callable[[pd.DataFrame, str, str], int]) -> int:
+        if write_type == "replace":
+            return load(df_clean, full_table_id, "WRITE_TRUNCATE")
 
         if write_type == "append":
             try:
@@ -485,11 +1399,7 @@ class BigQueryModule(DatabaseModule):
             if df_clean.empty:
                 return 0
 
-            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_APPEND")
-            self.client.load_table_from_dataframe(
-                df_clean, full_table_id, job_config=job_config
-            ).result()
-            return len(df_clean)
+            return load(df_clean, full_table_id, "WRITE_APPEND")
 
         if write_type == "merge":
             missing = [k for k in keys if k not in df_clean.columns]
@@ -499,10 +1409,7 @@ class BigQueryModule(DatabaseModule):
             temp_table_id = (
                 f"{full_table_id}_temp_{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
             )
-            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
-            self.client.load_table_from_dataframe(
-                df_clean, temp_table_id, job_config=job_config
-            ).result()
+            load(df_clean, temp_table_id, "WRITE_TRUNCATE")
 
             on_clause = " AND ".join(f"T.{k} = S.{k}" for k in keys)
             update_cols = ", ".join(
@@ -517,7 +1424,9 @@ class BigQueryModule(DatabaseModule):
                     USING `{temp_table_id}` S
                     ON {on_clause}
                     WHEN MATCHED THEN UPDATE SET {update_cols}
-                    WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals})
+                    WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals});
+
+                    DROP TABLE IF EXISTS `{self._row_hash_table_id(full_table_id)}`;
                 """).result()
             finally:
                 self.client.delete_table(temp_table_id, not_found_ok=True)
@@ -531,16 +1440,64 @@ class SupaBaseApi(DatabaseModule):
         self.supabase_url = st.secrets["supabase"].get("SUPABASE_URL")
         self.supabase_key = st.secrets["supabase"].get("SUPABASE_ANON_KEY")
         self.supabase_api_key = st.secrets["supabase"].get("API_KEY")
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
+        self.supabase = client_registry.get(
+            "supabase",
+            (self.supabase_url, self.supabase_key),
+            lambda: create_client(self.supabase_url, self.supabase_key),
+        )
 
     @st.cache_data(ttl=3600,show_spinner=False)
     def run_query(self, query: str):
         pass
     
+    def _rpc_job_logs(self, from_date: Optional[date], to_date: Optional[date]) -> List[Dict[str, Any]]:
+        params = {"p_api_key": self.supabase_api_key}
+        params["p_from_date"] = from_date.isoformat() if from_date else None
+        params["p_to_date"] = to_date.isoformat() if to_date else None
+        response = self.supabase.rpc("get_job_logs_with_api_key", params).execute()
+        return response.data or []
+
+    def _rpc_job_logs_range(self, from_date: date, to_date: date, truncated: List[date]) -> List[Dict[str, Any]]:
+        """
+        Fetch one date range, splitting it in half for as long as the RPC hits its row limit.
+        Single days that still hit the limit are appended to truncated.
+        """
+        data = self._rpc_job_logs(from_date, to_date)
+        if len(data) < JOB_LOGS_ROW_LIMIT:
+            return data
+        if from_date >= to_date:
+            truncated.append(from_date)
+            return data
+        mid = from_date + (to_date - from_date) // 2
+        return (self._rpc_job_logs_range(from_date, mid, truncated)
+                + self._rpc_job_logs_range(mid + timedelta(days=1), to_date, truncated))
+
+    def _fetch_job_logs_paginated(self, from_date: date, to_date: date, chunk_days: int, max_workers: int) -> Tuple[List[Dict[str, Any]], List[date]]:
+        """
+        Split [from_date, to_date] into chunks of chunk_days and fetch them with a bounded thread pool.
+        Returns the records and the days whose result hit the row limit (and may be truncated).
+        """
+        chunks = []
+        chunk_start = from_date
+        while chunk_start <= to_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), to_date)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+        truncated = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            results = list(pool.map(lambda chunk: self._rpc_job_logs_range(*chunk, truncated), chunks))
+        logger.info(f"Fetched job logs from {from_date} to {to_date} in {len(chunks)} chunks.")
+        return [record for result in results for record in result], sorted(truncated)
+
     @st.cache_data(ttl=600, show_spinner=False)
     def fetch_job_logs(_self,
         from_date: Optional[date] = None,
-        to_date: Optional[date] = None
+        to_date: Optional[date] = None,
+        paginate: bool = False,
+        chunk_days: int = 31,
+        max_workers: int = 4,
+        validation: ValidationMode = "full",
     ) -> pd.DataFrame:
         """
         Fetch job logs using API key with optional date filtering.
@@ -548,6 +1505,11 @@ class SupaBaseApi(DatabaseModule):
         Args:
             from_date: Optional start date (inclusive)
             to_date: Optional end date (inclusive)
+            paginate: Split the date range into chunks of chunk_days and fetch them in parallel
+                with at most max_workers requests at a time. Chunks that hit the 1000 row limit
+                of the RPC are split further, so long ranges return complete data.
+                Requires both dates (from the arguments or st.session_state.dates), raises ValueError otherwise.
+            validation: "off", "sampled" or "full" validation against JobLog. The summary is stored in df.attrs["validation"].
         
         Returns:
             DataFrame of job log records
@@ -575,26 +1537,30 @@ class SupaBaseApi(DatabaseModule):
 
         from_date = to_date_obj(from_date)
         to_date = to_date_obj(to_date)
-
-        params = {"p_api_key": _self.supabase_api_key}
-        params["p_from_date"] = from_date.isoformat() if from_date else None
-        params["p_to_date"] = to_date.isoformat() if to_date else None
         
+        if paginate and not (isinstance(from_date, date) and isinstance(to_date, date)):
+            raise ValueError(f"fetch_job_logs(paginate=True) needs both dates, got from_date={from_date!r}, to_date={to_date!r}")
+
         try:
-            # Call the RPC function
-            response = _self.supabase.rpc("get_job_logs_with_api_key", params).execute()
-            data = response.data
-            [JobLog.model_validate(record) for record in data] if data else None 
+            if paginate:
+                data, truncated = _self._fetch_job_logs_paginated(from_date, to_date, chunk_days, max_workers)
+            else:
+                data = _self._rpc_job_logs(from_date, to_date)
+                truncated = [f"{from_date} - {to_date}"] if len(data) >= JOB_LOGS_ROW_LIMIT else []
+            summary = validate_records(JobLog, data, mode=validation)
             
-            if data is None:
-                return pd.DataFrame()
             df = pd.DataFrame(data)
+            df.attrs["validation"] = summary
+            if paginate and not df.empty:
+                df = df.drop_duplicates(subset="id", keep="last")
+                df = df.sort_values("date_completed", kind="stable").reset_index(drop=True)
             string_cols = ["activity_id", "activity_name"]
             if set(string_cols).issubset(df.columns):
                 df[string_cols] = df[string_cols].fillna("").astype("string")
-            if len(df) == 1000:
-                logger.warning("Fetched 1000 records, which may indicate that the result is truncated. Please limit the search")
-                st.warning("Fetched 1000 records, which may indicate that the result is truncated. Please limit the search in the date filter.")
+            if truncated:
+                days = ", ".join(str(d) for d in truncated)
+                logger.warning(f"Fetched {JOB_LOGS_ROW_LIMIT} records for {days}, which may indicate that the result is truncated.")
+                st.warning(f"Fetched {JOB_LOGS_ROW_LIMIT} records for {days}, which may indicate that the result is truncated. Please limit the search in the date filter.")
             if df.empty:
                 logger.info("No job logs found for the given date range.")
                 st.warning("No job logs found for the given date range.")
@@ -605,7 +1571,7 @@ class SupaBaseApi(DatabaseModule):
             raise
 
     @st.cache_data(ttl=600,show_spinner=False)
-    def fetch_profiles(_self) -> list[dict[str, Any]]:
+    def fetch_profiles(_self, validation: ValidationMode = "full") -> list[dict[str, Any]]:
         """
         Fetch all user profiles for the organization.
         
@@ -638,8 +1604,9 @@ class SupaBaseApi(DatabaseModule):
             response = _self.supabase.rpc("get_profiles_with_api_key", {
                 "p_api_key": _self.supabase_api_key
             }).execute()
-            [User.model_validate(record) for record in response.data] if response.data else None
+            summary = validate_records(User, response.data, mode=validation)
             df = pd.DataFrame(response.data) if response.data else pd.DataFrame()
+            df.attrs["validation"] = summary
             return df
         except Exception as e:
             print(f"Error fetching profiles: {e}")
@@ -649,7 +1616,8 @@ class SupaBaseApi(DatabaseModule):
     def fetch_work_requests(_self,
         
         from_date: Optional[date] = None,
-        to_date: Optional[date] = None
+        to_date: Optional[date] = None,
+        validation: ValidationMode = "full",
     ) -> List[Dict[str, Any]]:
         """
         Fetch work requests (jobs) for the organization with optional date filtering.
@@ -684,7 +1652,7 @@ class SupaBaseApi(DatabaseModule):
                 params["p_to_date"] = to_date.isoformat()
             
             response = _self.supabase.rpc("get_work_requests_with_api_key", params).execute()
-            [WorkRequest.model_validate(record) for record in response.data] if response.data else None
+            validate_records(WorkRequest, response.data, mode=validation)
             return response.data if response.data else []
         except Exception as e:
             print(f"Error fetching work requests: {e}")
@@ -722,16 +1690,59 @@ class SupaBaseApi(DatabaseModule):
                 print(f"{app['user_first_name']} {app['user_last_name']} applied")
         """
         try:
-            response = _self.supabase.rpc("get_job_applications_with_api_key", {
-                "p_api_key": _self.supabase_api_key,
-                "p_work_request_id": work_request_id
-            }).execute()
-            
-            return response.data if response.data else []
+            return _self._rpc_job_applications(work_request_id)
         except Exception as e:
             print(f"Error fetching job applications: {e}")
             raise
 
+    def _rpc_job_applications(self, work_request_id: str) -> List[Dict[str, Any]]:
+        response = self.supabase.rpc("get_job_applications_with_api_key", {
+            "p_api_key": self.supabase_api_key,
+            "p_work_request_id": work_request_id
+        }).execute()
+        return response.data if response.data else []
+
+    @st.cache_data(ttl=600,show_spinner=False)
+    def fetch_job_applications_bulk(_self,
+        work_request_ids: List[str],
+        max_workers: int = 8,
+        _fetcher: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Fetch job applications for many work requests at once.
+
+        The work requests are fetched concurrently with at most max_workers requests at a time.
+
+        Args:
+            work_request_ids: UUIDs of the work requests
+            max_workers: Max number of concurrent RPC calls
+            _fetcher: Optional replacement for the per-request RPC, e.g. a stub in tests.
+                Not part of the cache key.
+
+        Returns:
+            DataFrame with one row per application, same fields as fetch_job_applications.
+            The work_request_id column is always present.
+
+        Example:
+            df = fetch_job_applications_bulk([wr["id"] for wr in work_requests])
+        """
+        ids = list(dict.fromkeys(work_request_ids))
+        if not ids:
+            return pd.DataFrame(columns=["work_request_id"])
+        try:
+            fetcher = _fetcher or _self._rpc_job_applications
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ids)))) as pool:
+                results = list(pool.map(fetcher, ids))
+        except Exception as e:
+            logger.error(f"Error fetching job applications: {e}")
+            raise
+
+        frames = [pd.DataFrame(rows).assign(work_request_id=wid) for wid, rows in zip(ids, results) if rows]
+        logger.info(f"Fetched applications for {len(ids)} work requests, {len(frames)} with applications.")
+        if not frames:
+            return pd.DataFrame(columns=["work_request_id"])
+        return pd.concat(frames, ignore_index=True)
+
     @st.cache_data(ttl=600,show_spinner=False)
     def get_teams(_self,):
         url = "https://nmsejeaoxglvbbhftean.supabase.co/functions/v1/admin-get-users"
@@ -749,12 +1760,12 @@ class SupaBaseApi(DatabaseModule):
     def build_combined(self,from_date : str | None = None, to_date : str | None = None, season : str | None = None,rates : list | None = None) -> pd.DataFrame:
         bc_m = self.fetch_profiles()
         bc_m = bc_m.loc[bc_m["role"] != "parent", :].drop(columns = ["role"]).copy()
-        df_bc = self.fetch_job_logs(from_date = from_date, to_date = to_date)
+        df_bc = self.fetch_job_logs(from_date = from_date, to_date = to_date, paginate = True)
         df_bc["season"] = season or "25/26"
-        bc_m["role"] = bc_m["date_of_birth"].apply(lambda x: self.apply_role(x, season=season))
+        bc_m["role"] = self.apply_roles(bc_m["date_of_birth"], season=season)
         df = pd.merge(df_bc, bc_m.loc[:,['id','email',"bank_account_number","role"]], left_on='worker_id', right_on='id', how='left')
         df["worker_name"] = df["worker_first_name"] + " " + df["worker_last_name"]
-        df["cost"] = df.apply(lambda row : self.apply_cost(row, rates), axis = 1)
+        df["cost"], _ = self.calc_costs(df, rates)
         to_keep = ["worker_id",
                    "worker_name", 
                    "role",
@@ -771,10 +1782,13 @@ class SupaBaseApi(DatabaseModule):
         df = df.loc[:,to_keep].copy()
         df["date_completed"] = pd.to_datetime(df["date_completed"], errors='coerce', utc=True)
         df["units_completed"] = df["units_completed"].fillna(0)
-        return df
+        # Label columns only: hours, units and cost stay float64 for pay and exports
+        return compact_frame(df, label="job logs")
     
 def get_supabase_api():
+    """Returns a SupaBaseApi using the process-wide supabase client from client_registry."""
     return SupaBaseApi()
 
 def get_bigquery_module():
+    """Returns a BigQueryModule using the process-wide bigquery client from client_registry."""
     return BigQueryModule()
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+
+class DateIndexedFrame:
+    '''
+    DataFrame sorted once by a date column, so any date range can be cut with a binary search.
+
+    The date column is converted to UTC datetimes once. Rows with a missing date are kept
+    at the end and never returned by a bounded slice.
+
+    Usage:
+        dated = DateIndexedFrame(df)
+        dated.slice(date(2025, 8, 1), date(2025, 8, 31))
+    '''
+
+    def __init__(self, df: pd.DataFrame, date_col: str = "date_completed"):
+        self.date_col = date_col
+        dates = df[date_col]
+        if not (isinstance(dates.dtype, pd.DatetimeTZDtype) and str(dates.dt.tz) == "UTC"):
+            dates = pd.to_datetime(dates, errors="coerce", utc=True)
+            df = df.assign(**{date_col: dates})
+        keys = dates.to_numpy(dtype="datetime64[ns]")
+        if not pd.Index(keys).is_monotonic_increasing:
+            order = np.argsort(keys, kind="stable")    # NaT sorts last
+            df, keys = df.iloc[order], keys[order]
+        self.df = df
+        self._keys = keys
+        self._n_dated = int(len(keys) - np.isnat(keys).sum())
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @staticmethod
+    def _to_key(value: DateLike) -> np.datetime64:
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return ts.normalize().to_datetime64()
+
+    def slice(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.DataFrame:
+        '''
+        Rows whose date (in UTC) is between start and end, both inclusive. None means unbounded.
+
+        Returns a view of the sorted frame: copy it before modifying it in place.
+        '''
+        dated = self._keys[:self._n_dated]
+        i = 0 if start is None else int(np.searchsorted(dated, self._to_key(start), side="left"))
+        j = self._n_dated if end is None else int(
+            np.searchsorted(dated, self._to_key(end) + np.timedelta64(1, "D"), side="left")
+        )
+        return self.df.iloc[i:max(i, j)]
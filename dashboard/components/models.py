@@ -1,8 +1,19 @@
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, TypeAdapter, ValidationError, field_validator
 from datetime import date, datetime
-from typing import Optional, Literal, Union
+from functools import lru_cache
+from typing import Optional, Literal, Union, Dict, List, Any, Type
 from uuid import UUID
+from collections import Counter
+import logging
 import math
+import random
+
+logger = logging.getLogger(__name__)
+
+# off     – no validation (trusted warehouse reads)
+# sampled – validate a random sample of the records
+# full    – validate every record (ingestion from buk.cash)
+ValidationMode = Literal["off", "sampled", "full"]
 
 class JobLog(BaseModel):
     id: UUID
@@ -317,4 +328,70 @@ class HistoricalJobEntry(BaseModel):
     def clean_hours(cls, v):
         if isinstance(v, float) and math.isnan(v):
             return 0.0
-        return v
\ No newline at end of file
+        return v
+
+
+class ValidationSummary(BaseModel):
+    model: str
+    mode: str
+    total: int
+    checked: int = 0
+    invalid_rows: int = 0
+    errors: Dict[str, int] = {}     # "field: message" -> antall feil
+
+    @property
+    def ok(self) -> bool:
+        return self.invalid_rows == 0
+
+    def __str__(self) -> str:
+        text = f"{self.model}: {self.invalid_rows}/{self.checked} invalid rows ({self.mode}, {self.total} total)"
+        if self.errors:
+            text += " – " + "; ".join(f"{k} (x{v})" for k, v in self.errors.items())
+        return text
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def validate_records(model: Type[BaseModel],
+                     records: List[Dict[str, Any]],
+                     mode: ValidationMode = "full",
+                     sample_size: int = 100,
+                     max_errors: int = 10) -> ValidationSummary:
+    """
+    Validate records against model in one batched TypeAdapter call and summarize the errors instead of raising.
+
+    Args:
+        model: pydantic model, e.g. JobLog
+        records: list of dicts, e.g. response.data or df.to_dict(orient="records")
+        mode: "off", "sampled" (sample_size random records) or "full"
+        max_errors: max number of distinct errors to keep in the summary
+    Returns:
+        ValidationSummary. Logged as a warning if any record is invalid.
+
+    Usage:
+        summary = validate_records(JobLog, response.data, mode="full")
+    """
+    records = records or []
+    summary = ValidationSummary(model=model.__name__, mode=mode, total=len(records))
+    if mode == "off" or not records:
+        return summary
+    if mode == "sampled" and len(records) > sample_size:
+        records = random.sample(records, sample_size)
+    summary.checked = len(records)
+
+    try:
+        _list_adapter(model).validate_python(records)
+    except ValidationError as e:
+        rows, errors = set(), Counter()
+        for error in e.errors():
+            loc = error["loc"]
+            rows.add(loc[0])
+            field = ".".join(str(part) for part in loc[1:]) or "record"
+            errors[f"{field}: {error['msg']}"] += 1
+        summary.invalid_rows = len(rows)
+        summary.errors = dict(errors.most_common(max_errors))
+        logger.warning(f"Validation failed for {summary}")
+    return summary
@@ -1,9 +1,9 @@
 from io import BytesIO
+import hashlib
 import logging
 import streamlit as st
 import pandas as pd
 from typing import Literal, TYPE_CHECKING
-from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
@@ -11,34 +11,54 @@ if TYPE_CHECKING:
     from dashboard.src.components.database_module import BigQueryModule
 
 
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of df (values, index, columns and dtypes). Equal frames give equal fingerprints."""
+    h = hashlib.sha1()
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode("utf-8"))
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts): hash their string representation instead
+        h.update(pd.util.hash_pandas_object(df.astype(str), index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _export_bytes(fingerprint: str, kind: Literal["csv", "xlsx"], _df: pd.DataFrame) -> bytes:
+    # fingerprint is the cache key, _df is not hashed by streamlit
+    if kind == "csv":
+        return _df.to_csv(index=False).encode("utf-8")
+    buffer = BytesIO()
+    df_excel = _df.copy()
+    for col in df_excel.select_dtypes(include=["datetimetz"]).columns:
+        df_excel[col] = df_excel[col].dt.tz_localize(None)
+    df_excel.to_excel(buffer, index=False, engine="openpyxl")
+    return buffer.getvalue()
+
+
 class DownloadComponent:
     def __init__(self,):
         pass 
 
-    def render_csv_download(self, df: pd.DataFrame, filename: str):
+    def _render_download(self, df: pd.DataFrame, kind: Literal["csv", "xlsx"], label: str, file_name: str, mime: str, key: str):
+        # The file is only generated when the button is clicked, and reused while df is unchanged
+        fingerprint = dataframe_fingerprint(df)
         st.download_button(
-            label="Last ned CSV",
-            data=df.to_csv(index=False).encode("utf-8"),
-            file_name=f"{filename}.csv",
-            mime="text/csv",
+            label=label,
+            data=lambda: _export_bytes(fingerprint, kind, df),
+            file_name=file_name,
+            mime=mime,
             icon="📄",
-            key = str(uuid4())  
+            key=f"download_{kind}_{file_name}_{key}",
         )
 
-    def render_xlsx_download(self, df: pd.DataFrame, filename: str):
-        buffer = BytesIO()
-        df_excel = df.copy()
-        for col in df_excel.select_dtypes(include=["datetimetz"]).columns:
-            df_excel[col] = df_excel[col].dt.tz_localize(None)
-        df_excel.to_excel(buffer, index=False, engine="openpyxl")
-        buffer.seek(0)
-        st.download_button(
-            label="Last ned Excel",
-            data=buffer.getvalue(),
-            file_name=f"{filename}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            icon="📄",
-            key = str(uuid4())
+    def render_csv_download(self, df: pd.DataFrame, filename: str, key: str = ""):
+        self._render_download(df, "csv", "Last ned CSV", f"{filename}.csv", "text/csv", key)
+
+    def render_xlsx_download(self, df: pd.DataFrame, filename: str, key: str = ""):
+        self._render_download(
+            df, "xlsx", "Last ned Excel", f"{filename}.xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key,
         )
         
     def render_bigquery_update(
@@ -49,14 +69,24 @@ class DownloadComponent:
         write_type: Literal["append", "replace", "merge"] = "append",
         merge_on: "str | list[str]" = "id",
         key: str = "",
+        detect_changes: bool = False,
     ):
         btn_key = f"bq_update_{target_table}_{write_type}_{key}"
         if st.button("Oppdater data i BigQuery", icon="🔄", key=btn_key):
             with st.spinner(f"Laster opp til `{target_table}`..."):
                 try:
-                    n = bq_module.write_df(df, target_table=target_table, write_type=write_type, merge_on=merge_on)
+                    n = bq_module.write_df(
+                        df, target_table=target_table, write_type=write_type, merge_on=merge_on,
+                        detect_changes=detect_changes,
+                    )
+                    stats = getattr(bq_module, "last_write_stats", None)
                     if n == 0:
                         st.info("Ingen nye rader å legge til — dataen er allerede oppdatert.")
+                    elif stats:
+                        st.success(
+                            f"{n} rader lastet opp til `{target_table}` ({write_type}): "
+                            f"{stats['inserted']} nye, {stats['updated']} endret, {stats['unchanged']} uendret."
+                        )
                     else:
                         st.success(f"{n} rader lastet opp til `{target_table}` ({write_type}).")
                 except Exception as e:
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, TYPE_CHECKING
+
+import pandas as pd
+from google.cloud import bigquery
+
+if TYPE_CHECKING:
+    from .database_module import BigQueryModule
+
+logger = logging.getLogger(__name__)
+
+# Anchored to the dashboard directory instead of the working directory. GENF_REPLICA_ROOT overrides it.
+DEFAULT_REPLICA_ROOT = Path(os.environ.get(
+    "GENF_REPLICA_ROOT",
+    Path(__file__).resolve().parents[1] / ".cache" / "registrations",
+))
+
+_replica_lock = threading.Lock()
+
+
+class RegistrationsReplica:
+    '''
+    Local Parquet copy of registrations.seasons, partitioned by season.
+
+    Each season is stored as one file (<root>/25-26.parquet). <root>/_watermark.json holds the
+    highest date_completed/id that has been replicated and when the last sync ran.
+    A refresh only pulls rows with date_completed after the watermark minus `lookback`,
+    and upserts them by id into the affected season files, so late registrations within
+    the lookback window are picked up too.
+
+    registrations.seasons has no insert/update timestamp, so rows inserted later with an older
+    date_completed, updates to older rows and deletions can not be seen by an incremental refresh.
+    The whole table is therefore re-read once every `full_refresh_interval`.
+
+    Usage:
+        df = RegistrationsReplica(bq).load()
+    '''
+    TABLE = "registrations.seasons"
+
+    def __init__(self,
+                 bq: "BigQueryModule",
+                 root: Path = DEFAULT_REPLICA_ROOT,
+                 refresh_interval: timedelta = timedelta(hours=1),
+                 lookback: timedelta = timedelta(days=14),
+                 full_refresh_interval: timedelta = timedelta(days=1)):
+        self.bq = bq
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self.lookback = lookback
+        self.full_refresh_interval = full_refresh_interval
+
+    @property
+    def watermark_path(self) -> Path:
+        return self.root / "_watermark.json"
+
+    def _partition_path(self, season) -> Path:
+        key = str(season).replace("/", "-") if pd.notna(season) else "unknown"
+        return self.root / f"{key}.parquet"
+
+    def read_watermark(self) -> Optional[dict]:
+        try:
+            return json.loads(self.watermark_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_watermark(self, df: pd.DataFrame, previous: Optional[dict]):
+        # previous is None after a full refresh
+        watermark = dict(previous or {})
+        if not df.empty and df["date_completed"].notna().any():
+            last = df.sort_values(["date_completed", "id"], na_position="first").iloc[-1]
+            if not previous or pd.Timestamp(last["date_completed"]) >= pd.Timestamp(previous["date_completed"]):
+                watermark["date_completed"] = pd.Timestamp(last["date_completed"]).isoformat()
+                watermark["id"] = None if pd.isna(last["id"]) else str(last["id"])
+        watermark["synced_at"] = datetime.now(timezone.utc).isoformat()
+        if previous is None:
+            watermark["full_synced_at"] = watermark["synced_at"]
+        tmp = self.watermark_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(watermark))
+        os.replace(tmp, self.watermark_path)
+
+    def _query(self, since: Optional[pd.Timestamp]) -> pd.DataFrame:
+        # Bypasses run_query: the replica must see the warehouse as it is now, not a cached result
+        if since is None:
+            return self.bq.client.query(f"SELECT * FROM {self.TABLE}").result().to_dataframe()
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("since", "TIMESTAMP", since.to_pydatetime()),
+        ])
+        return self.bq.client.query(
+            f"SELECT * FROM {self.TABLE} WHERE date_completed >= @since",
+            job_config=job_config,
+        ).result().to_dataframe()
+
+    @staticmethod
+    def _dedupe(df: pd.DataFrame) -> pd.DataFrame:
+        with_id = df.loc[df["id"].notna()].drop_duplicates(subset="id", keep="last")
+        without_id = df.loc[df["id"].isna()].drop_duplicates(keep="last")
+        return pd.concat([with_id, without_id]).sort_values("date_completed", kind="stable")
+
+    def _write_partitions(self, delta: pd.DataFrame, full: bool) -> set:
+        """Write each season of delta to a temporary file and move it into place. Returns the paths written."""
+        written = set()
+        for season, rows in delta.groupby("season", dropna=False, sort=False):
+            path = self._partition_path(season)
+            if not full and path.exists():
+                rows = self._dedupe(pd.concat([pd.read_parquet(path), rows], ignore_index=True))
+            tmp = path.with_suffix(".tmp")
+            rows.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            written.add(path)
+        return written
+
+    def is_stale(self) -> bool:
+        watermark = self.read_watermark()
+        if not watermark or "synced_at" not in watermark:
+            return True
+        synced_at = datetime.fromisoformat(watermark["synced_at"])
+        return datetime.now(timezone.utc) - synced_at > self.refresh_interval
+
+    def needs_full_refresh(self, watermark: Optional[dict]) -> bool:
+        if not watermark or not watermark.get("date_completed") or not watermark.get("full_synced_at"):
+            return True
+        if not any(self.root.glob("*.parquet")):
+            return True
+        full_synced_at = datetime.fromisoformat(watermark["full_synced_at"])
+        return datetime.now(timezone.utc) - full_synced_at > self.full_refresh_interval
+
+    def refresh(self, force: bool = False, full: bool = False) -> int:
+        '''
+        Pull new rows from the warehouse into the local files.
+        Re-reads the whole table when full=True or the last full refresh is older than full_refresh_interval.
+        Returns the number of rows pulled (0 if the replica was fresh enough to skip).
+        '''
+        with _replica_lock:
+            if not force and not full and not self.is_stale():
+                return 0
+            self.root.mkdir(parents=True, exist_ok=True)
+            watermark = self.read_watermark()
+            full = full or self.needs_full_refresh(watermark)
+            since = None if full else pd.Timestamp(watermark["date_completed"]) - self.lookback
+
+            delta = self._query(since)
+            written = self._write_partitions(delta, full=full) if not delta.empty else set()
+            if full:
+                # Seasons no longer in the warehouse. Removed only after the new files are in place
+                for path in set(self.root.glob("*.parquet")) - written:
+                    path.unlink()
+            self._write_watermark(delta, None if full else watermark)
+            logger.info(f"Replicated {len(delta)} rows from {self.TABLE} ({'full' if full else f'since {since}'}).")
+            return len(delta)
+
+    def load(self, columns: Optional[List[str]] = None, filters: Optional[list] = None, refresh: bool = True) -> pd.DataFrame:
+        '''
+        Read the replica, refreshing it first if it is older than refresh_interval.
+        The files are read under the same lock as refresh, so a concurrent refresh is never seen half done.
+
+        Args:
+            columns: only read these columns
+            filters: pyarrow row filters, e.g. [("role", "in", ["genf"])]
+        '''
+        if refresh:
+            self.refresh()
+        with _replica_lock:
+            paths = sorted(self.root.glob("*.parquet"))
+            if not paths:
+                return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+            return pd.concat([pd.read_parquet(path, columns=columns, filters=filters) for path in paths], ignore_index=True)
@@ -1,40 +1,240 @@
+import logging
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from typing import Literal
+import plotly.io as pio
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional
 
 from components import get_bigquery_module
+from components.other_components import dataframe_fingerprint
+
+logger = logging.getLogger(__name__)
+
+REGISTRATION_COLUMNS = ["worker_name", "season", "role", "cost", "hours_worked", "work_type", "date_completed"]
+FIGURE_CACHE_SIZE = 64
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _figure_json(fingerprint: str, chart: str, params: tuple, _build: Callable[[], go.Figure]) -> str:
+    # fingerprint, chart and params are the cache key, _build is not hashed by streamlit
+    return _build().to_json()
+
+
+def cached_figure(chart: str, data: pd.DataFrame, build: Callable[[], go.Figure], **params) -> go.Figure:
+    """
+    Figure from build(), reused as long as data and params are unchanged.
+    data should be the (aggregated) frame the figure is drawn from. The figure is cached as JSON,
+    least recently used first out, and every call returns a fresh go.Figure that is safe to modify.
+
+    Usage:
+        fig = cached_figure("stacked_cost", df_agg, lambda: build_fig(df_agg), x_col="season")
+    """
+    fingerprint = dataframe_fingerprint(data)
+    return pio.from_json(_figure_json(fingerprint, chart, tuple(sorted(params.items())), build))
+
+
+def _load_detail_rows(bq, roles: list | None = None, season: str | None = None) -> pd.DataFrame:
+    from_date = to_date = None
+    if season:
+        # Season "y1/y2" runs from August 1st y1 up to August 1st y2 (see apply_season)
+        start = 2000 + int(str(season)[:2])
+        from_date = pd.Timestamp(year=start, month=8, day=1)
+        to_date = pd.Timestamp(year=start + 1, month=8, day=1) - pd.Timedelta(microseconds=1)
+    df = bq.load_registrations(source="replica", columns=REGISTRATION_COLUMNS, roles=roles,
+                               from_date=from_date, to_date=to_date)
+    return bq.add_work_type_dimension(df)
+
+
+CAMP_RATE_COLUMNS = [f"{age}18_{camp}" for age in ("u", "o") for camp in ("nc", "pc", "sc")]
+
+
+def _camp_rates_by_year(camp_rates: pd.DataFrame) -> pd.DataFrame:
+    # BigQuery NUMERIC arrives as Decimal objects, which sum(numeric_only=True) would silently drop
+    rates = camp_rates.reindex(columns=["year", *CAMP_RATE_COLUMNS])
+    rates[CAMP_RATE_COLUMNS] = rates[CAMP_RATE_COLUMNS].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    return rates.groupby("year")[CAMP_RATE_COLUMNS].sum()
+
+
+class CampPriceIndex:
+    """
+    Camp price per person and season, built once from admin.camp_rates.
+    Season "y1/y2" costs nyttårscamp (nc) in y1 plus påskecamp (pc) and sommercamp (sc) in y2.
+
+    Usage:
+        prices = CampPriceIndex(bq.load_camp_rates())
+        prices.lookup(df["season"], u18=False)
+    """
+
+    def __init__(self, camp_rates: pd.DataFrame):
+        by_year = _camp_rates_by_year(camp_rates)
+        years = np.arange(by_year.index.min() - 1, by_year.index.max() + 1) if not by_year.empty else np.array([], dtype=int)
+        seasons = [f"{y % 100:02d}/{(y + 1) % 100:02d}" for y in years]
+        table = {}
+        for prefix, col in [("u", "u18"), ("o", "o18")]:
+            nc = by_year[f"{prefix}18_nc"].reindex(years, fill_value=0)
+            pc_sc = by_year[[f"{prefix}18_pc", f"{prefix}18_sc"]].sum(axis=1).reindex(years + 1, fill_value=0)
+            table[col] = nc.to_numpy(dtype=float) + pc_sc.to_numpy(dtype=float)
+        self.table = pd.DataFrame(table, index=pd.Index(seasons, name="season"))
+
+    def lookup(self, seasons: pd.Series, u18: bool = True) -> pd.Series:
+        """Camp price for each season in seasons. Unknown seasons cost 0."""
+        prices = self.table["u18" if u18 else "o18"]
+        return seasons.astype(str).map(prices).fillna(0.0).astype(float)
+
+    def price(self, season: str, u18: bool = True) -> float:
+        return float(self.table["u18" if u18 else "o18"].get(str(season), 0.0))
+
+
+class MemberCountIndex:
+    """
+    Prefix sums of members.yearly_count over birth years, so the number of members born in any
+    range of years is O(1).
+
+    Usage:
+        index = MemberCountIndex(members_count)
+        index.count(2008, 2010)
+    """
+
+    def __init__(self, members_count: pd.DataFrame):
+        counts = members_count.groupby("year")["members"].sum()
+        self.first_year = int(counts.index.min()) if not counts.empty else 0
+        last_year = int(counts.index.max()) if not counts.empty else -1
+        dense = counts.reindex(range(self.first_year, last_year + 1), fill_value=0).fillna(0)
+        self.cumulative = np.concatenate([[0], np.cumsum(dense.to_numpy(dtype=np.int64))])
+
+    def count(self, year_from, year_to):
+        """Members born in [year_from, year_to] (inclusive). Accepts scalars or numpy arrays."""
+        n = len(self.cumulative) - 1
+        lo = np.clip(np.asarray(year_from) - self.first_year, 0, n)
+        hi = np.clip(np.asarray(year_to) - self.first_year + 1, 0, n)
+        return self.cumulative[np.maximum(hi, lo)] - self.cumulative[lo]
+
+
+MENTOR_COUNT = 50   # Antatt antall mentorer på camp
+
+
+@st.cache_data(show_spinner=False)
+def project_camp_costs(camp_rates: pd.DataFrame, members_count: pd.DataFrame, year_from: int, year_to: int) -> pd.DataFrame:
+    """
+    Camp costs per role and year for year_from <= year < year_to, as if every registered member joins every camp.
+    Genf are 14-16 and hjelpementorer 17-18 years old at påske-/sommercamp; nyttårscamp is a year later in life.
+    Memoized per camp_rates/members_count content and year range.
+    """
+    members = MemberCountIndex(members_count)
+    by_year = _camp_rates_by_year(camp_rates)
+    years = np.arange(year_from, year_to)
+    rates = by_year.reindex(years, fill_value=0)
+    u18_pc_sc = (rates["u18_pc"] + rates["u18_sc"]).to_numpy(dtype=float)
+    u18_nc = rates["u18_nc"].to_numpy(dtype=float)
+
+    def cost_u18(oldest: int, youngest: int) -> np.ndarray:
+        # Born in [year - oldest, year - youngest]
+        paske_sommer = members.count(years - oldest, years - youngest) * u18_pc_sc
+        nyttaar = members.count(years - oldest + 1, years - youngest + 1) * u18_nc
+        return (paske_sommer + nyttaar).astype(np.int64)
+
+    genf = cost_u18(16, 14)
+    hm = cost_u18(18, 17)
+    mentor = (rates[["o18_nc", "o18_sc", "o18_pc"]].sum(axis=1).to_numpy(dtype=float) * MENTOR_COUNT).astype(np.int64)
+    return pd.DataFrame(
+        {"genf": genf, "hjelpementor": hm, "mentor": mentor, "total": genf + hm + mentor},
+        index=years,
+    )
+
+
+@dataclass(frozen=True)
+class ReviewDataset:
+    """
+    Registrations with derived columns (gruppe, prosjekt, year), camp rates, camp prices per season and yearly member counts.
+    Shared between all review components and sessions – treat the frames as read-only.
+    """
+    df: pd.DataFrame
+    camp_rates: pd.DataFrame
+    camp_prices: CampPriceIndex
+    members_count: pd.DataFrame
+
+
+# Tables the review dataset is built from. registrations.seasons is listed next to raw.hours since it may be a view
+REVIEW_SOURCE_TABLES = ("raw.hours", "registrations.seasons", "admin.camp_rates", "members.yearly_count")
+
+
+def load_review_dataset() -> ReviewDataset:
+    """
+    The review dataset for the current data version: rebuilt when any of REVIEW_SOURCE_TABLES is modified.
+    Also cleared by clear_review_dataset after a sync.
+
+    The charts only need per worker/season/role/work type/month sums, computed in BigQuery.
+    Raw registrations are read from the local replica only for drill-downs (SeasonBase.load_detail_rows).
+    """
+    bq = get_bigquery_module()
+    try:
+        version = bq._table_versions(*REVIEW_SOURCE_TABLES)
+    except Exception as e:
+        logger.warning(f"Could not read table metadata, caching the review dataset for an hour: {e}")
+        version = None
+    return _build_review_dataset(version)
+
+
+@st.cache_resource(ttl=3600, max_entries=2, show_spinner="Laster registreringer...")
+def _build_review_dataset(version: tuple | None) -> ReviewDataset:
+    # Not through run_query: this function is the cache, and a new version must see the new data
+    bq = get_bigquery_module()
+    df = bq.load_registration_aggregates(cached=False)
+    df["year"] = df["date_completed"].dt.year
+    camp_rates = bq.load_camp_rates(cached=False)
+    return ReviewDataset(
+        df=df,
+        camp_rates=camp_rates,
+        camp_prices=CampPriceIndex(camp_rates),
+        members_count=bq._execute_query("SELECT * FROM members.yearly_count"),
+    )
+
+
+def clear_review_dataset():
+    """Drop the shared review dataset, the cached table versions and the cached queries after a sync."""
+    bq = get_bigquery_module()
+    _build_review_dataset.clear()
+    bq._table_versions.clear()
+    bq.run_query.clear()
 
 
 class SeasonBase:
-    def __init__(self):
-        self.bq = get_bigquery_module()
-        self.df = self._load_registrations()
+    COLUMNS = REGISTRATION_COLUMNS
 
-        self.camp_rates = self.bq.load_camp_rates()
+    def __init__(self, dataset: Optional[ReviewDataset] = None):
+        """
+        Args:
+            dataset: shared ReviewDataset. Pass the same dataset to several components to load it once.
+        """
+        self.bq = get_bigquery_module()
+        self.dataset = dataset if dataset is not None else load_review_dataset()
+        # Shallow copies: new columns stay local to the component, the data itself is shared
+        self.df = self.dataset.df.copy(deep=False)
+        self.camp_rates = self.dataset.camp_rates.copy(deep=False)
+        self.camp_prices = self.dataset.camp_prices
         self.rates = self._prepare_rates()
 
         self.filter_inactive_bool = False
         self.filter_value = 500
 
-    def _load_registrations(self) -> pd.DataFrame:
-        df = self.bq.load_registrations()
-        df["gruppe"] = df["work_type"].apply(self.bq.mk_gruppe)
-        df["prosjekt"] = df["work_type"].apply(self.bq.mk_prosjekt)
-        return df
+    def load_detail_rows(self, roles: list | None = None, season: str | None = None) -> pd.DataFrame:
+        """Raw registrations from the local replica, for drill-downs below the monthly aggregates."""
+        return _load_detail_rows(self.bq, roles, season)
 
     def _get_camp_price_season(self, sesong: str, u18: bool = True) -> float:
-        prefix = "u" if u18 else "o"
-        try:
-            y1, y2 = [int("20" + p) for p in sesong.split("/")]
-        except Exception:
-            return 0.0
-        y1_price = self.camp_rates.loc[self.camp_rates["year"] == y1, f"{prefix}18_nc"].sum()
-        y2_price = self.camp_rates.loc[
-            self.camp_rates["year"] == y2, [f"{prefix}18_pc", f"{prefix}18_sc"]
-        ].sum().sum()
-        return float(y1_price + y2_price)
+        return self.camp_prices.price(sesong, u18=u18)
+
+    def _camp_cost_per_role(self, seasons: pd.Series, roles: pd.Series) -> np.ndarray:
+        # genf and hjelpementor pay the o18 price, mentors the u18 price, everyone else nothing
+        return np.select(
+            [roles.isin(["genf", "hjelpementor"]).to_numpy(), (roles == "mentor").to_numpy()],
+            [self.camp_prices.lookup(seasons, u18=False).to_numpy(), self.camp_prices.lookup(seasons, u18=True).to_numpy()],
+            default=0.0,
+        )
 
     def _prepare_rates(self) -> pd.DataFrame:
         raw = st.session_state.get("rates")
@@ -43,13 +243,13 @@ class SeasonBase:
         df = pd.DataFrame(raw) if isinstance(raw, list) else raw.copy()
         if "season" in df.columns and "sesong" not in df.columns:
             df = df.rename(columns={"season": "sesong"})
-        df["camp_u18"] = df["sesong"].apply(lambda s: self._get_camp_price_season(s, u18=True))
-        df["camp_o18"] = df["sesong"].apply(lambda s: self._get_camp_price_season(s, u18=False))
+        df["camp_u18"] = self.camp_prices.lookup(df["sesong"], u18=True).to_numpy()
+        df["camp_o18"] = self.camp_prices.lookup(df["sesong"], u18=False).to_numpy()
         return df
 
     def _filter_by_role(self, df: pd.DataFrame) -> pd.DataFrame:
         roles = st.session_state.get("role", [])
-        return df.loc[df["role"].isin(roles)].copy() if roles else df.copy()
+        return df.loc[df["role"].isin(roles)] if roles else df.copy(deep=False)
 
     def _filter_inactive(self):
         prefix = self.__class__.__name__
@@ -79,21 +279,30 @@ class SeasonBase:
         period_label = "sesong" if color_by == "season" else "år"
         label = "opptjente beløp" if type == "cost" else "arbeidede timer"
         st.markdown(f"## Fordeling av individuelle {label} per {period_label}")
-        fig = px.histogram(data, x=type, nbins=50, color=color_by, barmode="overlay", opacity=0.6)
+        values = data[[type, color_by]]
+        fig = cached_figure(
+            "individual_distribution", values,
+            lambda: px.histogram(values, x=type, nbins=50, color=color_by, barmode="overlay", opacity=0.6),
+            type=type, color_by=color_by,
+        )
         st.plotly_chart(fig, use_container_width=True, key=f"{self.__class__.__name__}_dist_{type}")
 
     def _build_stacked_cost_fig(self, df: pd.DataFrame, x_col: str, group_col: str) -> go.Figure:
-        df_agg = df.groupby([x_col, group_col]).agg({"cost": "sum"}).reset_index()
-        x_order = [str(x) for x in sorted(df_agg[x_col].dropna().unique(), key=str)]
-        fig = go.Figure()
-        for group in sorted(df_agg[group_col].dropna().unique()):
-            d = df_agg[df_agg[group_col] == group]
-            fig.add_trace(go.Bar(x=d[x_col].astype(str), y=d["cost"], name=group, offsetgroup="earned"))
-        fig.update_layout(
-            barmode="stack", yaxis_title="NOK",
-            xaxis={"categoryorder": "array", "categoryarray": x_order},
-        )
-        return fig
+        df_agg = df.groupby([x_col, group_col], observed=True).agg({"cost": "sum"}).reset_index()
+
+        def build() -> go.Figure:
+            x_order = [str(x) for x in sorted(df_agg[x_col].dropna().unique(), key=str)]
+            fig = go.Figure()
+            for group in sorted(df_agg[group_col].dropna().unique()):
+                d = df_agg[df_agg[group_col] == group]
+                fig.add_trace(go.Bar(x=d[x_col].astype(str), y=d["cost"], name=group, offsetgroup="earned"))
+            fig.update_layout(
+                barmode="stack", yaxis_title="NOK",
+                xaxis={"categoryorder": "array", "categoryarray": x_order},
+            )
+            return fig
+
+        return cached_figure("stacked_cost", df_agg, build, x_col=x_col, group_col=group_col)
 
     def _render_cost_vs_goal(self, summary_df: pd.DataFrame, x_col: str, key: str):
         fig = go.Figure()
@@ -101,6 +310,7 @@ class SeasonBase:
         fig.add_trace(go.Bar(x=summary_df[x_col].astype(str), y=summary_df["cost"], name="Opptjent", marker_color="lightsalmon"))
         st.plotly_chart(fig, use_container_width=True, key=key)
 
+    @st.fragment
     def render_avg_per_period_per_role(self, data: pd.DataFrame, period_col: str):
         period_label = "År" if period_col == "year" else "Sesong"
         st.markdown(f"## Gjennomsnitt per {period_label} per Rolle")
@@ -114,27 +324,31 @@ class SeasonBase:
         )
 
         avg_data = (
-            data.groupby([period_col, "role"])
+            data.groupby([period_col, "role"], observed=True)
             .agg(avg=(metric, "mean"), count=("worker_name", "count"))
             .reset_index()
             .rename(columns={"avg": f"avg_{metric}"})
             .sort_values(period_col, key=lambda s: s.astype(str))
         )
 
-        fig = px.bar(
-            avg_data,
-            x=avg_data[period_col].astype(str),
-            y=f"avg_{metric}",
-            color="role",
-            barmode="group",
-            text=avg_data[f"avg_{metric}"].round(0).astype(int),
-            labels={
-                f"avg_{metric}": "Gjennomsnitt opptjent (NOK)" if metric == "cost" else "Gjennomsnitt timer",
-                "x": period_label,
-                "role": "Rolle",
-            },
-        )
-        fig.update_traces(textposition="outside")
+        def build() -> go.Figure:
+            fig = px.bar(
+                avg_data,
+                x=avg_data[period_col].astype(str),
+                y=f"avg_{metric}",
+                color="role",
+                barmode="group",
+                text=avg_data[f"avg_{metric}"].round(0).astype(int),
+                labels={
+                    f"avg_{metric}": "Gjennomsnitt opptjent (NOK)" if metric == "cost" else "Gjennomsnitt timer",
+                    "x": period_label,
+                    "role": "Rolle",
+                },
+            )
+            fig.update_traces(textposition="outside")
+            return fig
+
+        fig = cached_figure("avg_per_period_per_role", avg_data, build, period_col=period_col, metric=metric)
         st.plotly_chart(fig, use_container_width=True, key=f"{self.__class__.__name__}_avg_per_{period_col}_role")
 
         with st.expander("Vis talldata"):
@@ -145,20 +359,11 @@ class SeasonBase:
 
     def create_season_data(self,df :  pd.DataFrame):
         r = self.bq.get_season_count()
-        avg_data = df.groupby(["season","role"]).agg({"cost" : "sum"}).reset_index()
+        avg_data = df.groupby(["season","role"], observed=True).agg({"cost" : "sum"}).reset_index()
         comb = pd.merge(avg_data, r, on=["season","role"], how="left").fillna(0)
         comb = comb.loc[comb["role"].isin(["genf", "hjelpementor"]), :]
         comb["avg_cost_per_person"] = comb["cost"] / comb["count"]
-
-        def apply_camp_cost(season : str, role : str):
-            if role in ["genf", "hjelpementor"]:
-                return self._get_camp_price_season(season, u18=False)
-            elif role == "mentor":
-                return self._get_camp_price_season(season, u18=True)
-            else:
-                return 0.0
-            
-        comb["camp_cost"] = comb.apply(lambda row: apply_camp_cost(row["season"], row["role"]), axis=1)
+        comb["camp_cost"] = self._camp_cost_per_role(comb["season"], comb["role"])
         comb["total_camp_cost"] = comb["count"] * comb["camp_cost"]
         return comb
     
@@ -187,28 +392,28 @@ class SeasonBase:
 
 
 class SeasonalReviewComponent(SeasonBase):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, dataset: Optional[ReviewDataset] = None):
+        super().__init__(dataset)
 
     def _prepare_bar_data(self, data: pd.DataFrame) -> pd.DataFrame:
         bar_data = self._apply_inactive_filter(data)
         bar_data["goal"] = 0.0
         if self.rates.empty:
             return bar_data
-        for season in self.rates["sesong"].unique():
-            row = self.rates.loc[self.rates["sesong"] == season]
-            if row.empty:
-                continue
-            u18_mask = bar_data["role"].isin(["genf", "hjelpementor"]) & (bar_data["season"] == season)
-            o18_mask = (bar_data["role"] == "mentor") & (bar_data["season"] == season)
-            bar_data.loc[u18_mask, "goal"] = row["camp_u18"].values[0]
-            bar_data.loc[o18_mask, "goal"] = row["camp_o18"].values[0]
+        goals = self.rates.drop_duplicates("sesong").set_index("sesong")
+        u18_goal = bar_data["season"].map(goals["camp_u18"]).astype(float).fillna(0.0)
+        o18_goal = bar_data["season"].map(goals["camp_o18"]).astype(float).fillna(0.0)
+        bar_data["goal"] = np.select(
+            [bar_data["role"].isin(["genf", "hjelpementor"]).to_numpy(), (bar_data["role"] == "mentor").to_numpy()],
+            [u18_goal.to_numpy(), o18_goal.to_numpy()],
+            default=0.0,
+        )
         return bar_data
 
     def render_active_members(self, bar_data: pd.DataFrame):
         st.markdown("## Opptjent vs Mål per Sesong")
         st.markdown("Sammenligning av opptjent beløp mot målbeløp per sesong")
-        bar_season = bar_data.groupby("season").agg({"cost": "sum", "goal": "sum"}).reset_index()
+        bar_season = bar_data.groupby("season", observed=True).agg({"cost": "sum", "goal": "sum"}).reset_index()
         self._render_cost_vs_goal(bar_season, "season", "seasonal_active_members")
         st.markdown("Viser kun oppnåelse av camp-kostnader for de som har jobbet i løpet av sesongen, ikke faktiske camp-deltakere.")
         st.info("**NB**: Husk å huk av for roller i sidebar. Viser alle roller 'by default'", icon="⚙️")
@@ -225,6 +430,7 @@ class SeasonalReviewComponent(SeasonBase):
         fig = self._build_stacked_cost_fig(df, "season", "prosjekt")
         st.plotly_chart(fig, use_container_width=True, key="seasonal_prosjekt_stack")
 
+    @st.fragment
     def render_goal(self, bar_data: pd.DataFrame):
         if "goal" not in bar_data.columns:
             st.warning("Mangler 'goal'-kolonne — kjør render_page for å beregne mål.")
@@ -249,7 +455,7 @@ class SeasonalReviewComponent(SeasonBase):
         )
         active = (
             data.loc[data["cost"] > active_threshold, ["worker_name", "season", "role"]]
-            .groupby(["role", "season"])
+            .groupby(["role", "season"], observed=True)
             .agg({"worker_name": "count"})
             .reset_index()
             .rename(columns={"worker_name": "active_members"})
@@ -268,21 +474,26 @@ class SeasonalReviewComponent(SeasonBase):
         registered_pivot = result.pivot(index="season", columns="role", values="registered_members").fillna(0).reindex(season_order).reset_index()
 
         colors = {"genf": "#5DADE2", "hjelpementor": "#58D68D", "mentor": "#F8B739"}
-        fig = go.Figure()
-        for role in ["genf", "hjelpementor", "mentor"]:
-            if role in active_pivot.columns:
-                fig.add_trace(go.Bar(
-                    x=active_pivot["season"], y=active_pivot[role],
-                    name=f"Aktiv {role}", offsetgroup="active",
-                    marker_color=colors[role], opacity=0.6,
-                ))
-            if role in registered_pivot.columns:
-                fig.add_trace(go.Bar(
-                    x=registered_pivot["season"], y=registered_pivot[role],
-                    name=f"Registrert {role}", offsetgroup="registered",
-                    marker_color=colors[role], opacity=1.0,
-                ))
-        fig.update_layout(barmode="stack")
+
+        def build() -> go.Figure:
+            fig = go.Figure()
+            for role in ["genf", "hjelpementor", "mentor"]:
+                if role in active_pivot.columns:
+                    fig.add_trace(go.Bar(
+                        x=active_pivot["season"], y=active_pivot[role],
+                        name=f"Aktiv {role}", offsetgroup="active",
+                        marker_color=colors[role], opacity=0.6,
+                    ))
+                if role in registered_pivot.columns:
+                    fig.add_trace(go.Bar(
+                        x=registered_pivot["season"], y=registered_pivot[role],
+                        name=f"Registrert {role}", offsetgroup="registered",
+                        marker_color=colors[role], opacity=1.0,
+                    ))
+            fig.update_layout(barmode="stack")
+            return fig
+
+        fig = cached_figure("active_per_role", active_pivot, build, registered=dataframe_fingerprint(registered_pivot))
         st.plotly_chart(fig, use_container_width=True, key="seasonal_active_per_role")
 
     def render_genf_goal_comparison(self, data: pd.DataFrame):
@@ -301,23 +512,30 @@ class SeasonalReviewComponent(SeasonBase):
 
         df = self._filter_by_role(self.df)
         data = (
-            df.groupby(["worker_name", "season", "role"])
+            df.groupby(["worker_name", "season", "role"], observed=True)
             .agg({"cost": "sum", "hours_worked": "sum"})
             .reset_index()
         )
 
-        self._filter_inactive()
-        bar_data = self._prepare_bar_data(data)
-
-        active_workers = bar_data[["worker_name", "season"]].drop_duplicates()
-        df_active = df.merge(active_workers, on=["worker_name", "season"], how="inner")
-
         #self.render_avg_per_period_per_role(bar_data, "season")
         self.render_avg_per_period_genf_only(df)
         st.divider()
         #self.render_active_members(bar_data)
         self.render_genf_goal_comparison(df)
         st.divider()
+        self.render_active_sections(df, data)
+        st.divider()
+        self.render_worker_registrations(data)
+
+    @st.fragment
+    def render_active_sections(self, df: pd.DataFrame, data: pd.DataFrame):
+        # Reruns on its own when the inactive filter changes; df and data are prepared once in render_page
+        self._filter_inactive()
+        bar_data = self._prepare_bar_data(data)
+
+        active_workers = bar_data[["worker_name", "season"]].drop_duplicates()
+        df_active = df.merge(active_workers, on=["worker_name", "season"], how="inner")
+
         self.render_gruppe_stack(df_active)
         st.divider()
         self.render_prosjekt_stack(df_active)
@@ -330,50 +548,55 @@ class SeasonalReviewComponent(SeasonBase):
         st.divider()
         self.render_active_per_role(bar_data)
 
+    @st.fragment
+    def render_worker_registrations(self, data: pd.DataFrame):
+        st.markdown("## Registreringer per Medlem")
+        st.markdown("Enkeltregistreringer for ett medlem i én sesong, lest fra den lokale kopien av registreringene.")
+        cols = st.columns(2)
+        worker = cols[0].selectbox(
+            "Medlem", options=sorted(data["worker_name"].dropna().unique()), index=None,
+            key="seasonal_drill_down_worker",
+        )
+        seasons = sorted(data.loc[data["worker_name"] == worker, "season"].dropna().unique(), key=str) if worker else []
+        season = cols[1].selectbox("Sesong", options=seasons, index=None, key="seasonal_drill_down_season")
+        if not worker or not season:
+            st.info("Velg medlem og sesong for å se registreringene.")
+            return
+
+        rows = self.load_detail_rows(roles=st.session_state.get("role") or None, season=season)
+        rows = rows.loc[rows["worker_name"] == worker].sort_values("date_completed")
+        st.dataframe(
+            rows[["date_completed", "role", "gruppe", "prosjekt", "hours_worked", "cost"]],
+            use_container_width=True, hide_index=True,
+        )
+
 
 class AnnualReviewComponent(SeasonBase):
-    def __init__(self):
-        super().__init__()
-        self.members_count = self.bq.run_query("SELECT * FROM members.yearly_count")
-
-    @staticmethod
-    def _calc_year_ranges(year: int) -> tuple:
-        return [year - 16, year - 14], [year - 18, year - 17]
-
-    def _calc_n(self, year_range: list) -> int:
-        return int(self.members_count.loc[
-            (self.members_count["year"] >= year_range[0]) &
-            (self.members_count["year"] <= year_range[1]),
-            "members",
-        ].sum())
-
-    def _calc_cost_u18(self, year: int, year_range: list) -> int:
-        n = self._calc_n(year_range)
-        paske_sommer = n * self.camp_rates.loc[
-            self.camp_rates["year"] == year, ["u18_pc", "u18_sc"]
-        ].sum().sum()
-        nyttaar = self._calc_n([i + 1 for i in year_range]) * self.camp_rates.loc[
-            self.camp_rates["year"] == year, "u18_nc"
-        ].sum()
-        return int(paske_sommer + nyttaar)
-
-    def _calc_cost_mentor(self, year: int, n: int = 50) -> int:
-        return int(
-            self.camp_rates.loc[
-                self.camp_rates["year"] == year, ["o18_nc", "o18_sc", "o18_pc"]
-            ].sum().sum() * n
+    def __init__(self,
+                 dataset: Optional[ReviewDataset] = None,
+                 year_from: int = 2023,
+                 year_to: Optional[int] = None):
+        """
+        Args:
+            year_from, year_to: years shown in the yearly charts and camp-cost projection (year_to exclusive).
+                year_to defaults to the year after the last year in admin.camp_rates.
+        """
+        super().__init__(dataset)
+        self.members_count = self.dataset.members_count
+        self.year_from = year_from
+        # Default horizon: every year with camp rates
+        self.year_to = year_to if year_to is not None else (
+            int(self.camp_rates["year"].max()) + 1 if not self.camp_rates.empty else year_from
         )
 
-    def _build_camp_costs_df(self, year_from: int = 2023, year_to: int = 2026) -> pd.DataFrame:
-        rows = {}
-        for year in range(year_from, year_to):
-            genf_range, hm_range = self._calc_year_ranges(year)
-            genf = self._calc_cost_u18(year, genf_range)
-            hm = self._calc_cost_u18(year, hm_range)
-            mentor = self._calc_cost_mentor(year)
-            rows[year] = {"genf": genf, "hjelpementor": hm, "mentor": mentor, "total": genf + hm + mentor}
-        return pd.DataFrame.from_dict(rows, orient="index")
+    def _build_camp_costs_df(self, year_from: Optional[int] = None, year_to: Optional[int] = None) -> pd.DataFrame:
+        return project_camp_costs(
+            self.camp_rates, self.members_count,
+            year_from if year_from is not None else self.year_from,
+            year_to if year_to is not None else self.year_to,
+        )
 
+    @st.fragment
     def render_yearly_costs(self, df: pd.DataFrame):
         st.markdown("## Kostnadsfordeling per Gruppe per År")
         st.markdown(
@@ -382,7 +605,7 @@ class AnnualReviewComponent(SeasonBase):
         )
         hide_camp = st.toggle("Skjul Camp kostnader", key="yearly_hide_camp")
 
-        df_year = df[df["year"] >= 2023]
+        df_year = df[df["year"] >= self.year_from]
         fig = self._build_stacked_cost_fig(df_year, "year", "gruppe")
 
         if not hide_camp:
@@ -401,12 +624,12 @@ class AnnualReviewComponent(SeasonBase):
     def render_prosjekt_stack(self, df: pd.DataFrame):
         st.markdown("## Kostnadsfordeling per Prosjekt per År")
         st.markdown("Totale kostnader per år, fordelt på prosjekt.")
-        fig = self._build_stacked_cost_fig(df[df["year"] >= 2023], "year", "prosjekt")
+        fig = self._build_stacked_cost_fig(df[df["year"] >= self.year_from], "year", "prosjekt")
         st.plotly_chart(fig, use_container_width=True, key="yearly_prosjekt_stack")
 
     def render_cost_vs_goal_yearly(self, df: pd.DataFrame):
         st.markdown("## Opptjent vs Mål per År")
-        earned = df[df["year"] >= 2023].groupby("year").agg({"cost": "sum"}).reset_index()
+        earned = df[df["year"] >= self.year_from].groupby("year").agg({"cost": "sum"}).reset_index()
         camp = self._build_camp_costs_df()
         camp.index.name = "year"
         camp_summary = camp[["total"]].rename(columns={"total": "goal"}).reset_index()
@@ -423,25 +646,32 @@ class AnnualReviewComponent(SeasonBase):
         df["year"] = df["date_completed"].dt.year
         df_month = df.groupby(["year", "month"]).agg({"hours_worked": "sum", "cost": "sum"}).reset_index()
         df_month["cost"] = df_month.groupby("year")["cost"].cumsum()
-        fig = go.Figure()
-        for year in df_month["year"].unique():
-            d = df_month[df_month["year"] == year]
-            fig.add_trace(go.Scatter(x=d["month"], y=d["cost"], name=str(year), mode="lines"))
+
+        def build() -> go.Figure:
+            fig = go.Figure()
+            for year in df_month["year"].unique():
+                d = df_month[df_month["year"] == year]
+                fig.add_trace(go.Scatter(x=d["month"], y=d["cost"], name=str(year), mode="lines"))
+            return fig
+
+        fig = cached_figure("cumulative_costs", df_month, build)
         st.plotly_chart(fig, use_container_width=True, key="yearly_cumulative")
 
     def render_page(self):
-        self._filter_inactive()
-
         df = self._filter_by_role(self.df)
-        df = df.copy()
-        df["year"] = df["date_completed"].dt.year
 
         # Aggregate per person+year+role for per-person metrics
         data_per_year = (
-            df.groupby(["worker_name", "year", "role"])
+            df.groupby(["worker_name", "year", "role"], observed=True)
             .agg({"cost": "sum", "hours_worked": "sum"})
             .reset_index()
         )
+        self.render_active_sections(df, data_per_year)
+
+    @st.fragment
+    def render_active_sections(self, df: pd.DataFrame, data_per_year: pd.DataFrame):
+        # Reruns on its own when the inactive filter changes; df and data_per_year are prepared once in render_page
+        self._filter_inactive()
         data_per_year = self._apply_inactive_filter(data_per_year)
 
         # Re-join to original df for date-based charts (filter out inactive workers)
@@ -0,0 +1,48 @@
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+# Low-cardinality labels as categoricals, free text as Arrow strings.
+# hours_worked, units_completed and cost stay float64: they are summed into pay and exported,
+# where float32 rounding would show (7.3 -> 7.300000190734863).
+REGISTRATION_DTYPES = {
+    "worker_name": ARROW_STRING,
+    "role": "category",
+    "season": "category",
+    "work_type": "category",
+    "gruppe": "category",
+    "prosjekt": "category",
+    "n_registrations": "Int32",
+}
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Bytes held by df, including the Python strings in object columns."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compact_frame(df: pd.DataFrame, dtypes: dict = REGISTRATION_DTYPES, label: str = "frame") -> pd.DataFrame:
+    """
+    Cast the columns of df that appear in dtypes, in place, and log the memory saved.
+    Columns that cannot be cast are left as they are. The sizes in bytes are kept in
+    df.attrs["memory"] as {"before": ..., "after": ...}.
+
+    Usage:
+        df = compact_frame(df, label="registrations")
+    """
+    before = memory_usage(df)
+    for col, dtype in dtypes.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        try:
+            df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not cast {label}.{col} to {dtype}: {e}")
+    after = memory_usage(df)
+    df.attrs["memory"] = {"before": before, "after": after}
+    logger.info(f"Compacted {label} ({len(df)} rows): {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    return df
@@ -25,7 +25,7 @@ tabs = st.tabs(["Timer", "Brukere", "Jobber"])
 with tabs[0]:
     st.info(f"Viser for periode {st.session_state.dates[0]} til {st.session_state.dates[1]}")
     # ==== DATA CLEANING =====
-    df = api.fetch_job_logs(from_date=st.session_state.dates[0], to_date=st.session_state.dates[1])
+    df = api.fetch_job_logs(from_date=st.session_state.dates[0], to_date=st.session_state.dates[1], paginate=True)
     st.markdown(f"First registation : {df['date_completed'].min()} - Last registration: {df['date_completed'].max()}")
     st.dataframe(df, use_container_width=True)
     
@@ -37,7 +37,7 @@ with tabs[0]:
     with cols[1]:
         DownloadComponent().render_xlsx_download(df, filename="buk_cash")
     with cols[2]:
-        DownloadComponent().render_bigquery_update(df = df, bq_module=bq_module, target_table="raw.job_logs", write_type="merge")
+        DownloadComponent().render_bigquery_update(df = df, bq_module=bq_module, target_table="raw.job_logs", write_type="merge", detect_changes=True)
     
     
 with tabs[1]:
@@ -49,7 +49,7 @@ with tabs[1]:
         members_bc = pd.DataFrame(data)
         members_bc = members_bc.loc[members_bc["role"] != "parent"].copy()
         members_bc["date_of_birth"] = pd.to_datetime(members_bc["date_of_birth"], errors='coerce', format="%Y-%m-%d")
-        members_bc["role"] = members_bc.apply(lambda row: api.apply_role(row["date_of_birth"]) if pd.notnull(row["date_of_birth"]) else "unknown", axis=1)
+        members_bc["role"] = api.apply_roles(members_bc["date_of_birth"]).fillna("unknown")
         
         with st.expander(f"Medlemmer under 13 år (rolle 'u13')", expanded=False):
             for row in members_bc.loc[members_bc["role"]=="u13",:].itertuples():
@@ -78,12 +78,12 @@ with tabs[1]:
         raw_data = pd.DataFrame(data)
         cols  = st.columns(3)
         with cols[0]:
-            DownloadComponent().render_csv_download(raw_data, filename="buk_cash")
+            DownloadComponent().render_csv_download(raw_data, filename="buk_cash", key="profiles")
         
         with cols[1]:
-            DownloadComponent().render_xlsx_download(raw_data, filename="buk_cash")
+            DownloadComponent().render_xlsx_download(raw_data, filename="buk_cash", key="profiles")
         with cols[2]:
-            DownloadComponent().render_bigquery_update(raw_data, bq_module=bq_module, target_table="raw.users", write_type="merge")
+            DownloadComponent().render_bigquery_update(raw_data, bq_module=bq_module, target_table="raw.users", write_type="merge", detect_changes=True)
 
 with tabs[2]:
     st.markdown("## Jobber")
@@ -94,25 +94,26 @@ with tabs[2]:
     if "id" not in df_team_users.columns:
         st.error("id column not found in team users data")
     #st.dataframe(data, use_container_width=True)
-    for i in data:
-        if i.get("desired_start_date") >= str(date.today()):
-            if st.button(f"{i.get('desired_start_date')}: \
-                         \t {i.get('title')} - {i.get('location')} - \
-                         {i.get('estimated_hours')} timer", key=i['id']):
-                with st.container(border=True,):
-                    job_data = api.fetch_job_applications(work_request_id=i['id'])
-                    df_r = pd.DataFrame(job_data).loc[:,["user_id","user_first_name", "user_last_name", "user_email"]]
-                    df = pd.merge(df_r, raw_data[["id","date_of_birth"]], left_on="user_id", right_on="id", how="left", suffixes=("","_profile"))
-                    df = pd.merge(df, df_team_users[["id","team_name",]], left_on="user_id", right_on="id", how="left")
-                    df["role"] = df["date_of_birth"].apply(lambda x: api.apply_role(x) if pd.notnull(x) else "unknown")
-                    df.drop(columns=["id"], inplace=True, errors='ignore')
-                    st.dataframe(df, use_container_width=True)
-                    cols  = st.columns(3)
-                    with cols[0]:
-                        DownloadComponent().render_csv_download(df, filename="work_requests")
-                    
-                    with cols[1]:
-                        DownloadComponent().render_xlsx_download(df, filename="work_requests")
-                    with cols[2]:
-                        DownloadComponent().render_bigquery_update(df, bq_module=bq_module, target_table="raw.work_requests", write_type="replace")
-        
\ No newline at end of file
+    upcoming = [i for i in data if i.get("desired_start_date") >= str(date.today())]
+    for i in upcoming:
+        if st.button(f"{i.get('desired_start_date')}: \
+                     \t {i.get('title')} - {i.get('location')} - \
+                     {i.get('estimated_hours')} timer", key=i['id']):
+            with st.container(border=True,):
+                # Only fetched for the clicked work request, so a page load does not fire one RPC per request
+                job_data = pd.DataFrame(api.fetch_job_applications(work_request_id=i['id']))
+                df_r = job_data.reindex(columns=["user_id","user_first_name", "user_last_name", "user_email"])
+                df = pd.merge(df_r, raw_data[["id","date_of_birth"]], left_on="user_id", right_on="id", how="left", suffixes=("","_profile"))
+                df = pd.merge(df, df_team_users[["id","team_name",]], left_on="user_id", right_on="id", how="left")
+                df["role"] = api.apply_roles(df["date_of_birth"]).fillna("unknown")
+                df.drop(columns=["id"], inplace=True, errors='ignore')
+                st.dataframe(df, use_container_width=True)
+                cols  = st.columns(3)
+                with cols[0]:
+                    DownloadComponent().render_csv_download(df, filename="work_requests", key=i['id'])
+                
+                with cols[1]:
+                    DownloadComponent().render_xlsx_download(df, filename="work_requests", key=i['id'])
+                with cols[2]:
+                    DownloadComponent().render_bigquery_update(df, bq_module=bq_module, target_table="raw.work_requests", write_type="replace")
+    
\ No newline at end of file
@@ -1,6 +1,7 @@
 import streamlit as st
 from dashboard import init
 from components import SeasonalReviewComponent,SidebarComponent, AnnualReviewComponent
+from components import load_review_dataset, clear_review_dataset
 from components import get_bigquery_module
 import logging
 logger = logging.getLogger(__name__)
@@ -13,16 +14,25 @@ if sync_data:
     bq = get_bigquery_module()
     try:
         bq.transfer_to_hours()
+        clear_review_dataset()
         st.success("Data synkronisert!")
     except Exception as e:
         st.error(f"Det skjedde en feil under synkronisering av data: {e}")
         logger.error(f"Feil under synkronisering av data: {e}", exc_info=True)
 
+dataset = None
+try:
+    dataset = load_review_dataset()
+except Exception as e:
+    st.error(f"Det skjedde en feil under innlastning av registreringer: {e}")
+    logger.error(f"Feil under innlastning av registreringer: {e}", exc_info=True)
+    st.stop()
+
 tabs = st.tabs(["Sesong", "År"])
 with tabs[0]:
     st.title("Sesonggjennomgang")
     try:
-        SeasonalReviewComponent().render_page()
+        SeasonalReviewComponent(dataset=dataset).render_page()
     except Exception as e:
         st.error(f"Det skjedde en feil under innlastning av sesonggjennomgangen: {e}")
         logger.error(f"Feil under innlastning av sesonggjennomgangen: {e}", exc_info=True)
@@ -30,7 +40,7 @@ with tabs[0]:
 with tabs[1]:
     st.title("Årsgjennomgang")
     try:
-        AnnualReviewComponent().render_page()
+        AnnualReviewComponent(dataset=dataset).render_page()
     except Exception as e:
         st.error(f"Det skjedde en feil under innlastning av årsgjennomgangen: {e}")
         logger.error(f"Feil under innlastning av årsgjennomgangen: {e}", exc_info=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import pytest
 from dashboard.components.database_module import DatabaseModule, SupaBaseApi
 import pandas as pd
-from datetime import datetime,date
+from datetime import datetime,date,timedelta
 from unittest.mock import patch, Mock
 
 def test_get_current_sesion():
@@ -39,6 +39,12 @@ def test_mk_prosjekt():
     assert DatabaseModule().mk_prosjekt("arvoll_kafe_og_vedpakking") == "kafe og vedpakking"
     assert DatabaseModule().mk_prosjekt("glenne") == "glenne"
 
+def test_add_work_type_dimension():
+    df = pd.DataFrame({"work_type": ["glenne_vedpakking", "glenne", None, "arvoll_kafe_og_vedpakking", "glenne_vedpakking"]})
+    df = DatabaseModule().add_work_type_dimension(df)
+    assert df["gruppe"].tolist() == ["glenne", "glenne", None, "arvoll", "glenne"]
+    assert df["prosjekt"].tolist() == ["vedpakking", "glenne", None, "kafe og vedpakking", "vedpakking"]
+
 def test_apply_cost():
     rates = [{"genf": 100, "hjelpementor": 150, "mentor": 200, "vedsekk": 20, "season": "25/26"},
              {"genf": 90, "hjelpementor": 140, "mentor": 190, "vedsekk": 15, "season": "24/25"}]
@@ -62,3 +68,339 @@ def test_apply_cost():
 
 
 
+def test_calc_costs_matches_apply_cost():
+    rates = [{"genf": 100, "hjelpementor": 150, "mentor": 200, "vedsekk": 20, "season": "25/26"},
+             {"genf": 90, "hjelpementor": 140, "mentor": 190, "vedsekk": 15, "season": "24/25"}]
+    df = pd.DataFrame([
+        {"work_type": "glenne_vedpakking", "hours_worked": 5, "units_completed" : 10, "role" : "genf", "season": "25/26"},
+        {"work_type": "glenne_vedpakking", "hours_worked": 5, "units_completed" : 70, "role" : "mentor", "season": "24/25"},
+        {"work_type": "bccof_vask", "hours_worked": 10, "units_completed" : None, "role" : "hjelpementor", "season": "25/26"},
+        {"work_type": "bccof_vask", "hours_worked": 3, "units_completed" : None, "role" : "u13", "season": "25/26"},
+        {"work_type": "bccof_vask", "hours_worked": 2, "units_completed" : None, "role" : "genf", "season": "23/24"},
+    ])
+    cost, missing = DatabaseModule().calc_costs(df, rates)
+    expected = [DatabaseModule().apply_cost(row, rates) for _, row in df.iterrows()]
+    assert cost.tolist() == expected
+    assert missing == {"season": 1, "hourly": 0, "vedsekk": 0, "u13": 1}
+
+def test_calc_costs_missing_rates():
+    df = pd.DataFrame([
+        {"work_type": "glenne_vedpakking", "hours_worked": 1, "units_completed" : 4, "role" : "genf", "season": "25/26"},
+        {"work_type": "bccof_vask", "hours_worked": 2, "units_completed" : None, "role" : "unknown", "season": "25/26"},
+    ])
+    cost, missing = DatabaseModule().calc_costs(df, [{"genf": 100, "season": "25/26"}])
+    assert cost.iloc[0] == 4 * 15
+    assert pd.isna(cost.iloc[1])
+    assert missing["vedsekk"] == 1 and missing["hourly"] == 1
+
+    with pytest.raises(ValueError):
+        DatabaseModule().calc_costs(df.assign(role=None), [])
+
+def test_parse_roles_matches_parse_role():
+    birth_years = pd.Series(range(1990, 2016))
+    for season in ["22/23", "25/26"]:
+        roles = DatabaseModule().parse_roles(birth_years, season)
+        assert roles.tolist() == [DatabaseModule().parse_role(y, season) for y in birth_years]
+
+def test_apply_roles():
+    birth_dates = pd.Series(["2012-05-15", "2008-05-15", None, "not-a-date", "2013-11-02"])
+    roles = DatabaseModule().apply_roles(birth_dates, season="25/26")
+    assert isinstance(roles.dtype, pd.CategoricalDtype)
+    assert roles.iloc[[0, 1, 4]].tolist() == ["genf", "hjelpementor", "u13"]
+    assert roles.iloc[[2, 3]].isna().all()
+
+    seasons = pd.Series(["22/23", "25/26", "25/26", "25/26", "25/26"])
+    roles = DatabaseModule().apply_roles(pd.Series(["2008-01-01"] * 5), season=seasons)
+    assert roles.tolist() == ["genf"] + ["hjelpementor"] * 4
+
+def test_apply_seasons():
+    dates = pd.Series([date(2025, 8, 1), date(2025, 7, 31), None, datetime(2023, 1, 5)])
+    seasons = DatabaseModule().apply_seasons(dates)
+    assert seasons.iloc[[0, 1, 3]].tolist() == ["25/26", "24/25", "22/23"]
+    assert pd.isna(seasons.iloc[2])
+    assert seasons.iloc[0] == DatabaseModule().apply_season(dates.iloc[0])
+
+def test_client_registry_shares_and_rotates_clients():
+    from dashboard.components.clients import ClientRegistry
+    registry = ClientRegistry()
+    factory = Mock(side_effect=lambda: Mock())
+
+    first = registry.get("supabase", ("url", "key"), factory)
+    assert registry.get("supabase", ("url", "key"), factory) is first
+    assert factory.call_count == 1
+
+    rotated = registry.get("supabase", ("url", "new-key"), factory)
+    assert rotated is not first
+    first.close.assert_called_once()
+
+    registry.invalidate("supabase")
+    rotated.close.assert_called_once()
+    assert registry.get("supabase", ("url", "new-key"), factory) is not rotated
+    assert factory.call_count == 3
+
+def test_build_registrations_query():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+
+    query, params = bq.build_registrations_query()
+    assert query == "SELECT * FROM registrations.seasons"
+    assert params == ()
+
+    query, params = bq.build_registrations_query(columns=["worker_name", "cost"], from_date="2025-08-01", to_date=date(2026, 6, 30), roles=["genf", "mentor"])
+    assert query == ("SELECT worker_name, cost FROM registrations.seasons "
+                     "WHERE date_completed >= @from_date AND date_completed <= @to_date AND role IN UNNEST(@roles)")
+    assert [p[:2] for p in params] == [("from_date", "TIMESTAMP"), ("to_date", "TIMESTAMP"), ("roles", "ARRAY<STRING>")]
+    assert params[2][2] == ("genf", "mentor")
+
+    with pytest.raises(ValueError):
+        bq.build_registrations_query(columns=["cost; DROP TABLE x"])
+
+
+def test_validate_records_modes():
+    from dashboard.components.models import JobLog, validate_records
+    valid = {"id": "7b0c7c1e-3f0a-4a3e-9d6d-2b6a4f1e9a11", "worker_id": "7b0c7c1e-3f0a-4a3e-9d6d-2b6a4f1e9a12",
+             "organization_id": "7b0c7c1e-3f0a-4a3e-9d6d-2b6a4f1e9a13", "work_type": "bccof_vask",
+             "date_completed": "2025-01-01", "hours_worked": 2.0, "created_at": "2025-01-01T10:00:00",
+             "hourly_rate": 150.0, "worker_first_name": "Ola", "worker_last_name": "Nordmann"}
+    records = [valid] * 5 + [{**valid, "hours_worked": "mye"}, {**valid, "hours_worked": None, "id": "x"}]
+
+    summary = validate_records(JobLog, records, mode="full")
+    assert (summary.total, summary.checked, summary.invalid_rows) == (7, 7, 2)
+    assert sum(summary.errors.values()) == 3
+    assert any(key.startswith("hours_worked") for key in summary.errors)
+
+    assert validate_records(JobLog, records, mode="off").checked == 0
+    assert validate_records(JobLog, records, mode="sampled", sample_size=3).checked == 3
+    assert validate_records(JobLog, [valid], mode="full").ok
+
+
+def test_get_season_count():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    bq.client.get_table.return_value.modified = datetime(2025, 1, 1)
+    bq.client.query.return_value.to_dataframe.side_effect = [
+        pd.DataFrame({"season": ["24/25", "25/26"]}),
+        pd.DataFrame({"birth_year": [1990, 2008, 2009, 2010, 2015], "count": [7, 1, 2, 4, 3]}),
+    ]
+    expected = pd.DataFrame({
+        "season": ["24/25"] * 4 + ["25/26"] * 4,
+        "role": ["u13", "genf", "hjelpementor", "mentor"] * 2,
+        "count": [3, 6, 1, 7, 3, 4, 3, 7],
+    })
+
+    r = bq.get_season_count()
+    pd.testing.assert_frame_equal(r.assign(role=r["role"].astype(str)), expected, check_dtype=False)
+
+    # Unchanged tables: served from cache, and the table versions are not fetched again
+    bq.get_season_count()
+    assert bq.client.query.call_count == 2
+    assert bq.client.get_table.call_count == 2
+
+
+def test_transfer_to_hours_incremental():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    watermark = pd.DataFrame({"created_at": [pd.Timestamp("2025-03-01 12:00", tz="UTC")], "id": ["b"]})
+    job_logs = pd.DataFrame({
+        "id": ["c", "d"], "worker_id": ["w1", "w2"], "work_type": ["bccof_vask"] * 2,
+        "date_completed": [1740873600, 1740960000], "hours_worked": [2.0, 3.0],
+        "created_at": ["2025-03-02T10:00:00+00:00", "2025-03-02T10:00:00+00:00"],
+        "worker_first_name": ["Ola", "Kari"], "worker_last_name": ["Nordmann", "Nordmann"],
+        "date_of_birth": ["2009-01-01", None], "age_category": ["U16", None],
+    })
+    queries = []
+
+    def execute(query, params=()):
+        queries.append((query, params))
+        return {0: watermark, 1: job_logs}.get(len(queries) - 1, pd.DataFrame())
+
+    with patch.object(bq, "_execute_query", side_effect=execute):
+        assert bq.transfer_to_hours(lookback=timedelta(0), engine="pandas") == 2
+
+    select, params = queries[1]
+    assert "NOT EXISTS" not in select
+    assert dict((n, v) for n, _, v in params) == {"since": datetime(2025, 3, 1, 12, tzinfo=watermark["created_at"][0].tzinfo), "since_id": "b"}
+    staged = bq.client.load_table_from_dataframe.call_args.args[0]
+    assert list(staged["role"]) == ["genf", "unknown"]
+    assert list(staged["worker_name"]) == ["Ola Nordmann", "Kari Nordmann"]
+    # New watermark: newest created_at, highest id
+    assert dict((n, v) for n, _, v in queries[2][1])["id"] == "d"
+
+
+def test_transfer_to_hours_sql_falls_back_to_pandas():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    scripts = []
+
+    def execute(query, params=()):
+        scripts.append(query)
+        if "CREATE TEMP TABLE delta" in query:
+            return pd.DataFrame({"n": [3]})
+        return pd.DataFrame()
+
+    with patch.object(bq, "_execute_query", side_effect=execute):
+        assert bq.transfer_to_hours(mode="full") == 3
+    script = scripts[-1]
+    assert "NOT EXISTS" in script and "MERGE `genf-446213.raw.hours`" in script
+    bq.client.load_table_from_dataframe.assert_not_called()
+
+    with patch.object(bq, "_execute_query", side_effect=[RuntimeError("boom"), pd.DataFrame()]) as execute_mock:
+        assert bq.transfer_to_hours(mode="full") == 0
+    assert "j.*" in execute_mock.call_args.args[0]
+
+
+def test_coerce_df_to_schema_uses_cached_schema():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    bq.invalidate_table_schema()
+    fields = {"id": "STRING", "date_completed": "INTEGER", "approved": "BOOL", "hours_worked": "FLOAT"}
+    bq.client.get_table.return_value.schema = [Mock(field_type=t) for t in fields.values()]
+    for field, name in zip(bq.client.get_table.return_value.schema, fields):
+        field.name = name
+
+    df = pd.DataFrame({
+        "id": [1, 2, None],
+        "date_completed": ["2025-01-01T00:00:01+01:00", "2025-01-01T00:00:01+00:00", None],
+        "approved": [" Yes", False, None],
+        "hours_worked": ["1.5", "x", None],
+    })
+    out = bq._coerce_df_to_schema(df, "p.raw.t")
+    assert out["date_completed"].tolist()[:2] == [1735689601 - 3600, 1735689601]
+    assert out["date_completed"].isna().tolist() == [False, False, True]
+    assert out["approved"].tolist()[:2] == [True, False] and pd.isna(out["approved"][2])
+    assert out["id"].tolist()[:2] == ["1.0", "2.0"]
+
+    bq._coerce_df_to_schema(df, "p.raw.t")
+    assert bq.client.get_table.call_count == 1
+    # Unknown column: schema is fetched again
+    bq._coerce_df_to_schema(df.assign(new=1), "p.raw.t")
+    assert bq.client.get_table.call_count == 2
+    bq.invalidate_table_schema("p.raw.t")
+    bq._coerce_df_to_schema(df, "p.raw.t")
+    assert bq.client.get_table.call_count == 3
+
+
+def test_write_df_loads_parquet_chunks(tmp_path):
+    import io
+    import pyarrow.parquet as pq
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    loads = []
+
+    def load_table_from_file(f, table_id, job_config, rewind=False):
+        if rewind:
+            f.seek(0)
+        loads.append((pq.read_table(io.BytesIO(f.read())), table_id, job_config.write_disposition))
+        return Mock()
+
+    bq.client.load_table_from_file.side_effect = load_table_from_file
+    df = pd.DataFrame({"id": list("abcde"), "date_completed": pd.date_range("2025-01-01", periods=5), "hours_worked": [1, 2, 3, 4, 5]})
+    with patch.object(bq, "get_table_schema", return_value={"id": "STRING", "date_completed": "TIMESTAMP", "hours_worked": "FLOAT"}):
+        assert bq.write_df(df, target_table="raw.t", write_type="replace", chunk_rows=2) == 5
+
+    # replace loads every chunk into a staging table, then swaps it in with one copy job
+    staging = loads[0][1]
+    assert staging.startswith("genf-446213.raw.t__load_")
+    assert [(len(t), tid, d) for t, tid, d in loads] == [(2, staging, "WRITE_TRUNCATE"), (2, staging, "WRITE_APPEND"), (1, staging, "WRITE_APPEND")]
+    bq.client.copy_table.assert_called_once()
+    assert bq.client.copy_table.call_args.args == (staging, "genf-446213.raw.t")
+    assert bq.client.copy_table.call_args.kwargs["job_config"].write_disposition == "WRITE_TRUNCATE"
+    bq.client.delete_table.assert_any_call(staging, not_found_ok=True)
+    assert str(loads[0][0].schema.field("date_completed").type) == "timestamp[us, tz=UTC]"
+    assert str(loads[0][0].schema.field("hours_worked").type) == "double"
+
+    # A failed load keeps the staged file
+    bq.client.load_table_from_file.side_effect = RuntimeError("boom")
+    with patch.object(bq, "get_table_schema", return_value=None), pytest.raises(RuntimeError):
+        bq.write_df(df, target_table="raw.t", write_type="replace", staging_dir=tmp_path)
+    assert len(list(tmp_path.glob("t_*.parquet"))) == 1
+
+    # A failed chunk never touches the target table
+    bq.client.copy_table.reset_mock()
+    with patch.object(bq, "get_table_schema", return_value=None), pytest.raises(RuntimeError):
+        bq.write_df(df, target_table="raw.t", write_type="replace", chunk_rows=2)
+    bq.client.copy_table.assert_not_called()
+
+    # Appends go through the staging table as well, and a failed chunk appends nothing
+    bq.client.load_table_from_file.side_effect = load_table_from_file
+    loads.clear()
+    assert bq.load_parquet(df, "genf-446213.raw.t", "WRITE_APPEND", chunk_rows=2) == 5
+    assert {tid for _, tid, _ in loads} == {loads[0][1]} and loads[0][1].startswith("genf-446213.raw.t__load_")
+    assert bq.client.copy_table.call_args.kwargs["job_config"].write_disposition == "WRITE_APPEND"
+
+    bq.client.copy_table.reset_mock()
+    bq.client.load_table_from_file.side_effect = [Mock(), RuntimeError("boom"), RuntimeError("boom"), RuntimeError("boom"), Mock()]
+    with pytest.raises(RuntimeError):
+        bq.load_parquet(df, "genf-446213.raw.t", "WRITE_APPEND", chunk_rows=2, max_workers=1)
+    bq.client.copy_table.assert_not_called()
+
+
+def test_write_df_merge_uploads_changed_rows_only():
+    from dashboard.components.database_module import BigQueryModule
+    bq = BigQueryModule.__new__(BigQueryModule)
+    bq.client = Mock()
+    df = pd.DataFrame({"id": ["a", "b", "c"], "hours_worked": [1.0, 2.0, 3.0]})
+    stored = pd.DataFrame({"id": ["a", "b"], "row_hash": BigQueryModule.row_hashes(df)[:2]})
+    df.loc[1, "hours_worked"] = 2.5
+    uploaded = []
+
+    with patch.object(bq, "get_table_schema", return_value=None), \
+         patch.object(bq, "_execute_query", return_value=stored), \
+         patch.object(bq, "load_parquet", side_effect=lambda frame, *a, **kw: uploaded.append(frame) or len(frame)):
+        assert bq.write_df(df, target_table="raw.t", write_type="merge", detect_changes=True) == 2
+        assert bq.last_write_stats == {"inserted": 1, "updated": 1, "unchanged": 1}
+        assert uploaded[0]["id"].tolist() == ["b", "c"]
+        assert "_row_hash" in uploaded[0].columns
+
+    stored = pd.DataFrame({"id": ["a", "b", "c"], "row_hash": BigQueryModule.row_hashes(df)})
+    with patch.object(bq, "get_table_schema", return_value=None), \
+         patch.object(bq, "_execute_query", return_value=stored), \
+         patch.object(bq, "load_parquet") as load:
+        assert bq.write_df(df[["hours_worked", "id"]], target_table="raw.t", write_type="merge", detect_changes=True) == 0
+        load.assert_not_called()
+        assert bq.last_write_stats == {"inserted": 0, "updated": 0, "unchanged": 3}
+
+    # Without detect_changes every row is sent, and the merge script drops the stale hash sidecar
+    bq.client.reset_mock()
+    with patch.object(bq, "get_table_schema", return_value=None), \
+         patch.object(bq, "_execute_query"), \
+         patch.object(bq, "load_parquet", side_effect=lambda frame, *a, **kw: len(frame)):
+        assert bq.write_df(df, target_table="raw.t", write_type="merge") == 3
+        assert bq.last_write_stats is None
+    assert "DROP TABLE IF EXISTS `genf-446213.raw.t__row_hashes`" in bq.client.query.call_args.args[0]
+    assert all("__row_hashes" not in str(c) for c in bq.client.delete_table.call_args_list)
+
+
+def test_find_deviations():
+    dates = pd.to_datetime(["2025-03-03"] * 4 + ["2025-03-08"] * 3 + ["2025-03-04"] * 2, utc=True)  # Mon, Sat, Tue
+    df = pd.DataFrame({
+        "date_completed": dates,
+        "work_type": ["bccof_vask"] * 4 + ["bccof_rigg"] * 3 + ["annet_jobbhvit"] * 2,
+        "worker_name": list("abcdefgij"),
+        "role": ["genf", "genf", "mentor", "genf", "genf", "genf", "mentor", "genf", "genf"],
+        "hours_worked": [2.0, 2.0, 2.0, 3.5, 5.0, 4.0, 4.0, 1.0, 9.0],
+    })
+    flags = DatabaseModule().find_deviations(df)
+
+    # Same groups as the old per-group loop in timer.py
+    old = {key for key, g in df.groupby(["date_completed", "work_type"])
+           if key[1] != "annet_jobbhvit" and (g["hours_worked"] > g["hours_worked"].median() * 1.5).any()}
+    assert set(map(tuple, flags.loc[flags["group_has_outlier"], ["date_completed", "work_type"]].drop_duplicates().values)) == old
+    assert flags.loc[flags["is_outlier"], "worker_name"].tolist() == ["d"]
+    # genf limits: 2.5 on weekdays, 4.5 on weekends
+    assert flags.loc[flags["over_limit"], "worker_name"].tolist() == ["d", "j", "e"]
+    assert flags.set_index("worker_name").loc["e", "hour_limit"] == 4.5
+
+    # Rows without a date or work type are in no group but can still be over their limit
+    extra = pd.DataFrame({"date_completed": pd.to_datetime([None, "2025-03-03"], utc=True), "work_type": ["bccof_vask", None],
+                          "worker_name": ["k", "l"], "role": ["genf", "genf"], "hours_worked": [3.0, 1.0]})
+    df = pd.concat([df, extra], ignore_index=True)
+    flags = DatabaseModule().find_deviations(df)
+    assert flags["group_has_outlier"].dtype == bool
+    assert flags.set_index("worker_name").loc["k", "over_limit"]
+    assert "l" not in flags["worker_name"].tolist()
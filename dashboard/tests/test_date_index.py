@@ -0,0 +1,19 @@
+import pandas as pd
+from datetime import date
+from dashboard.components.date_index import DateIndexedFrame
+
+
+def test_date_indexed_frame_slices_inclusive_dates():
+    df = pd.DataFrame({
+        "id": ["c", "a", "d", "b", "e"],
+        "date_completed": ["2025-09-10T23:30:00Z", "2025-09-01T08:00:00Z", None, "2025-09-05T12:00:00Z", "2025-09-11T00:00:00Z"],
+    })
+    dated = DateIndexedFrame(df)
+
+    assert str(dated.df["date_completed"].dt.tz) == "UTC"
+    assert list(dated.slice(date(2025, 9, 1), date(2025, 9, 10))["id"]) == ["a", "b", "c"]
+    assert list(dated.slice("2025-09-06", "2025-09-11")["id"]) == ["c", "e"]
+    assert list(dated.slice(start=date(2025, 9, 6))["id"]) == ["c", "e"]
+    assert list(dated.slice()["id"]) == ["a", "b", "c", "e"]
+    assert dated.slice(date(2025, 9, 12), date(2025, 9, 30)).empty
+    assert dated.slice(date(2025, 9, 10), date(2025, 9, 1)).empty
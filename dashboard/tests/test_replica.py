@@ -0,0 +1,89 @@
+import threading
+import pandas as pd
+from datetime import timedelta
+from unittest.mock import Mock
+from dashboard.components.replica import RegistrationsReplica, _replica_lock
+
+
+def make_bq(*frames):
+    bq = Mock()
+    bq.client.query.return_value.result.return_value.to_dataframe.side_effect = list(frames)
+    return bq
+
+
+def registrations(rows):
+    df = pd.DataFrame(rows, columns=["id", "worker_name", "season", "date_completed", "cost"])
+    df["date_completed"] = pd.to_datetime(df["date_completed"], utc=True)
+    return df
+
+
+def test_replica_full_then_incremental(tmp_path):
+    full = registrations([
+        ("a", "Ola", "24/25", "2025-03-01", 100.0),
+        ("b", "Kari", "25/26", "2025-09-01", 200.0),
+    ])
+    delta = registrations([
+        ("b", "Kari", "25/26", "2025-09-01", 250.0),
+        ("c", "Per", "25/26", "2025-09-10", 300.0),
+    ])
+    bq = make_bq(full, delta)
+    replica = RegistrationsReplica(bq, root=tmp_path, lookback=timedelta(days=7))
+
+    assert replica.refresh() == 2
+    assert sorted(p.name for p in tmp_path.glob("*.parquet")) == ["24-25.parquet", "25-26.parquet"]
+    assert replica.read_watermark()["id"] == "b"
+
+    # Fresh replica: no new query
+    assert replica.refresh() == 0
+    assert bq.client.query.call_count == 1
+
+    assert replica.refresh(force=True) == 2
+    job_config = bq.client.query.call_args.kwargs["job_config"]
+    assert job_config.query_parameters[0].value == pd.Timestamp("2025-08-25", tz="UTC")
+
+    df = replica.load(refresh=False)
+    assert sorted(df["id"]) == ["a", "b", "c"]
+    assert df.set_index("id").loc["b", "cost"] == 250.0
+    assert replica.read_watermark()["id"] == "c"
+
+    df = replica.load(columns=["worker_name", "cost"], refresh=False)
+    assert list(df.columns) == ["worker_name", "cost"]
+
+
+def test_replica_full_refresh_drops_deleted_rows(tmp_path):
+    full = registrations([
+        ("a", "Ola", "24/25", "2025-03-01", 100.0),
+        ("b", "Kari", "25/26", "2025-09-01", 200.0),
+    ])
+    # "a" was deleted and "b" changed after the first sync
+    resync = registrations([
+        ("b", "Kari", "25/26", "2025-09-01", 150.0),
+    ])
+    bq = make_bq(full, resync)
+    replica = RegistrationsReplica(bq, root=tmp_path, full_refresh_interval=timedelta(0))
+
+    replica.refresh()
+    assert replica.needs_full_refresh(replica.read_watermark())
+    assert replica.refresh(force=True) == 1
+    # Full refresh: no date filter
+    assert "job_config" not in bq.client.query.call_args.kwargs
+
+    df = replica.load(refresh=False)
+    assert df["id"].tolist() == ["b"]
+    assert df["cost"].tolist() == [150.0]
+
+
+def test_replica_load_waits_for_refresh(tmp_path):
+    full = registrations([("a", "Ola", "24/25", "2025-03-01", 100.0)])
+    replica = RegistrationsReplica(make_bq(full), root=tmp_path)
+    replica.refresh()
+    result = []
+
+    # A refresh in another session holds the lock while it rewrites the files
+    with _replica_lock:
+        reader = threading.Thread(target=lambda: result.append(replica.load(refresh=False)))
+        reader.start()
+        reader.join(timeout=0.2)
+        assert reader.is_alive()
+    reader.join(timeout=5)
+    assert result[0]["id"].tolist() == ["a"]
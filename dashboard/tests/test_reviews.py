@@ -0,0 +1,118 @@
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import pandas as pd
+from dashboard.components.reviews import CampPriceIndex, MemberCountIndex, project_camp_costs
+from dashboard.components.reviews import load_review_dataset, clear_review_dataset
+
+
+def make_camp_rates(**overrides) -> pd.DataFrame:
+    rows = []
+    for i, year in enumerate([2024, 2025, 2026]):
+        rows.append({
+            "year": year,
+            "u18_nc": 1000 + i, "u18_pc": 2000 + i, "u18_sc": 3000 + i,
+            "o18_nc": 1500 + i, "o18_pc": 2500 + i, "o18_sc": 3500 + i,
+        })
+    df = pd.DataFrame(rows)
+    for col, values in overrides.items():
+        df[col] = values
+    return df
+
+
+def test_camp_price_index_maps_season_to_nc_and_next_pc_sc():
+    prices = CampPriceIndex(make_camp_rates())
+
+    # 24/25: nyttårscamp 2024 + påske- og sommercamp 2025
+    assert prices.price("24/25") == 1000 + 2001 + 3001
+    assert prices.price("24/25", u18=False) == 1500 + 2501 + 3501
+    assert prices.price("25/26") == 1001 + 2002 + 3002
+    # Edges only have half a season
+    assert prices.price("23/24") == 2000 + 3000
+    assert prices.price("26/27") == 1002
+    assert prices.price("30/31") == 0.0
+
+    looked_up = prices.lookup(pd.Series(["24/25", "25/26", None]))
+    assert looked_up.tolist() == [6002.0, 6005.0, 0.0]
+
+
+def test_camp_price_index_accepts_decimal_columns():
+    # BigQuery NUMERIC columns come back as Decimal objects
+    rates = make_camp_rates()
+    decimals = rates.assign(**{col: rates[col].map(Decimal).astype(object) for col in rates.columns if col != "year"})
+
+    assert CampPriceIndex(decimals).table.equals(CampPriceIndex(rates).table)
+
+
+# Old per-year implementation from AnnualReviewComponent, kept as a reference
+def old_calc_n(members_count: pd.DataFrame, year_range: list) -> int:
+    return int(members_count.loc[
+        (members_count["year"] >= year_range[0]) &
+        (members_count["year"] <= year_range[1]),
+        "members",
+    ].sum())
+
+
+def old_calc_cost_u18(camp_rates: pd.DataFrame, members_count: pd.DataFrame, year: int, year_range: list) -> int:
+    n = old_calc_n(members_count, year_range)
+    paske_sommer = n * camp_rates.loc[camp_rates["year"] == year, ["u18_pc", "u18_sc"]].sum().sum()
+    nyttaar = old_calc_n(members_count, [i + 1 for i in year_range]) * camp_rates.loc[
+        camp_rates["year"] == year, "u18_nc"
+    ].sum()
+    return int(paske_sommer + nyttaar)
+
+
+def old_calc_cost_mentor(camp_rates: pd.DataFrame, year: int, n: int = 50) -> int:
+    return int(camp_rates.loc[camp_rates["year"] == year, ["o18_nc", "o18_sc", "o18_pc"]].sum().sum() * n)
+
+
+def make_members_count() -> pd.DataFrame:
+    # Gaps (2011) and a duplicated birth year (2009), as in members.yearly_count
+    years = [2004, 2005, 2006, 2007, 2008, 2009, 2009, 2010, 2012]
+    return pd.DataFrame({"year": years, "members": [3, 11, 17, 23, 29, 31, 2, 37, 41]})
+
+
+def test_member_count_index_matches_old_calc_n():
+    members_count = make_members_count()
+    index = MemberCountIndex(members_count)
+
+    for year_from in range(2000, 2015):
+        for year_to in range(year_from - 1, 2016):
+            assert index.count(year_from, year_to) == old_calc_n(members_count, [year_from, year_to])
+
+
+def test_project_camp_costs_matches_old_calc_cost():
+    camp_rates, members_count = make_camp_rates(), make_members_count()
+
+    df = project_camp_costs(camp_rates, members_count, 2023, 2028)
+
+    assert df.index.tolist() == list(range(2023, 2028))
+    for year in df.index:
+        genf = old_calc_cost_u18(camp_rates, members_count, year, [year - 16, year - 14])
+        hm = old_calc_cost_u18(camp_rates, members_count, year, [year - 18, year - 17])
+        mentor = old_calc_cost_mentor(camp_rates, year)
+        assert df.loc[year].tolist() == [genf, hm, mentor, genf + hm + mentor]
+
+
+def test_load_review_dataset_rebuilds_when_tables_change():
+    bq = Mock()
+    bq.load_registration_aggregates.side_effect = lambda **kw: pd.DataFrame({"date_completed": pd.to_datetime(["2025-01-01"], utc=True)})
+    bq.load_camp_rates.return_value = make_camp_rates()
+    bq._execute_query.return_value = make_members_count()
+    bq._table_versions.side_effect = [("v1",), ("v1",), ("v2",)]
+
+    with patch("dashboard.components.reviews.get_bigquery_module", return_value=bq):
+        clear_review_dataset()
+        first = load_review_dataset()
+        assert load_review_dataset() is first
+        assert bq.load_registration_aggregates.call_count == 1
+
+        second = load_review_dataset()
+        assert second is not first
+        assert bq.load_registration_aggregates.call_count == 2
+        # Built from uncached queries, so the rest of run_query's cache is left alone
+        bq.load_registration_aggregates.assert_called_with(cached=False)
+        bq.load_camp_rates.assert_called_with(cached=False)
+        bq.run_query.assert_not_called()
+        assert bq.run_query.clear.call_count == 1
+        clear_review_dataset()
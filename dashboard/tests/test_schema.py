@@ -0,0 +1,30 @@
+import pandas as pd
+from dashboard.components.database_module import DatabaseModule
+from dashboard.components.schema import compact_frame
+
+
+def test_compact_frame_shrinks_registrations():
+    n = 1000
+    df = pd.DataFrame({
+        "worker_name": [f"Ola Nordmann {i % 50}" for i in range(n)],
+        "role": ["genf", "mentor"] * (n // 2),
+        "season": ["24/25", "25/26", None, "25/26"] * (n // 4),
+        "work_type": ["glenne_vedpakking", "bccof_vask"] * (n // 2),
+        "hours_worked": [2.5] * n,
+        "cost": [312.5] * n,
+        "comments": ["x"] * n,
+    })
+    df = compact_frame(df, label="test")
+
+    assert isinstance(df["role"].dtype, pd.CategoricalDtype)
+    assert df["worker_name"].dtype == pd.StringDtype("pyarrow")
+    assert df["hours_worked"].dtype == "float64"
+    assert df["cost"].dtype == "float64"
+    assert df["comments"].dtype == object
+    assert df["season"].isna().sum() == n // 4
+    assert df.attrs["memory"]["after"] < df.attrs["memory"]["before"] / 2
+
+    df = DatabaseModule().add_work_type_dimension(df)
+    assert isinstance(df["gruppe"].dtype, pd.CategoricalDtype)
+    assert list(df["gruppe"].cat.categories) == ["bccof", "glenne"]
+    assert df["prosjekt"].iloc[:2].tolist() == ["vedpakking", "vask"]
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import patch, Mock
+from dashboard.components.database_module import SupaBaseApi
+from datetime import date
+
+
+def test_fetch_job_logs_paginated():
+    from .fixtures.data_buk_cash import job_logs
+    with patch("dashboard.components.database_module.create_client"),\
+    patch("dashboard.components.database_module.st") as mock_st:
+        api = SupaBaseApi()
+        calls = []
+
+        def fake_rpc(from_date, to_date):
+            calls.append((from_date, to_date))
+            # Every chunk returns the same log, and the first chunk hits the row limit once
+            if from_date == date(2026, 1, 1) and to_date == date(2026, 1, 31):
+                return [dict(job_logs[1], id=str(i)) for i in range(1000)]
+            return [job_logs[0]]
+
+        api._rpc_job_logs = fake_rpc
+        df = api.fetch_job_logs(from_date="2026-01-01", to_date="2026-03-15", paginate=True, chunk_days=31, max_workers=2)
+
+    assert (date(2026, 1, 1), date(2026, 1, 16)) in calls
+    assert (date(2026, 1, 17), date(2026, 1, 31)) in calls
+    assert (date(2026, 3, 4), date(2026, 3, 15)) in calls
+    assert df["id"].is_unique
+    assert len(df) == 1
+    mock_st.warning.assert_not_called()
+
+
+def test_fetch_job_logs_warns_when_a_day_is_truncated():
+    from .fixtures.data_buk_cash import job_logs
+    with patch("dashboard.components.database_module.create_client"),\
+    patch("dashboard.components.database_module.st") as mock_st:
+        api = SupaBaseApi()
+
+        def fake_rpc(from_date, to_date):
+            if from_date <= date(2026, 1, 3) <= to_date:
+                return [dict(job_logs[1], id=f"{from_date}-{i}") for i in range(1000)]
+            return []
+
+        api._rpc_job_logs = fake_rpc
+        api.fetch_job_logs(from_date="2026-01-01", to_date="2026-01-10", paginate=True, chunk_days=10)
+
+    assert "2026-01-03" in mock_st.warning.call_args.args[0]
+
+
+def test_fetch_job_logs_paginate_requires_dates():
+    with patch("dashboard.components.database_module.create_client"),\
+    patch("dashboard.components.database_module.st") as mock_st:
+        mock_st.session_state.get.return_value = None
+        api = SupaBaseApi()
+        with pytest.raises(ValueError):
+            api.fetch_job_logs(from_date="2026-01-01", paginate=True)
+
+
+def test_fetch_job_applications_bulk():
+    with patch("dashboard.components.database_module.create_client"),\
+    patch("dashboard.components.database_module.st"):
+        api = SupaBaseApi()
+        applications = {
+            "wr-1": [{"user_email": "a@b.no", "created_at": "2026-01-01T10:00:00+00:00"}],
+            "wr-2": [],
+            "wr-3": [{"user_email": "c@d.no", "created_at": "2026-01-02T10:00:00+00:00"},
+                     {"user_email": "e@f.no", "created_at": "2026-01-02T11:00:00+00:00"}],
+        }
+        stub = Mock(side_effect=lambda wid: applications[wid])
+        df = api.fetch_job_applications_bulk(["wr-1", "wr-2", "wr-3", "wr-1"], max_workers=2, _fetcher=stub)
+
+    assert stub.call_count == 3
+    assert len(df) == 3
+    assert df.groupby("work_request_id").size().to_dict() == {"wr-1": 1, "wr-3": 2}
+
+
+def test_build_combined_compacts_labels_only():
+    import pandas as pd
+    from .fixtures.data_buk_cash import job_logs, profiles
+    with patch("dashboard.components.database_module.create_client"),\
+    patch("dashboard.components.database_module.st"):
+        api = SupaBaseApi()
+        api.fetch_profiles = lambda: pd.DataFrame(profiles)
+        api.fetch_job_logs = lambda **kw: pd.DataFrame(job_logs)
+        df = api.build_combined(season="25/26", rates=[])
+
+    assert len(df) == len(job_logs)
+    for col in ["role", "season", "work_type"]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+    assert df["worker_name"].dtype == pd.StringDtype("pyarrow")
+    for col in ["hours_worked", "cost"]:
+        assert df[col].dtype == "float64"